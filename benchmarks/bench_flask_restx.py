@@ -0,0 +1,87 @@
+"""
+Measure performances of handlers registered by layaberr.flask_restx.add_error_handlers.
+
+Run with: python -m pytest benchmarks/bench_flask_restx.py
+"""
+
+import pytest
+from flask import Flask
+from flask_restx import Api, Resource
+from werkzeug.exceptions import BadRequest, Forbidden, Unauthorized
+
+import layaberr.flask_restx
+
+
+def application(errors: dict = None, fast_path: bool = False):
+    app = Flask(__name__)
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    app.config["ERROR_INCLUDE_MESSAGE"] = False
+    # Server errors are logged by Flask-RestX, this is not what is measured
+    app.logger.disabled = True
+    api = Api(app)
+    layaberr.flask_restx.add_error_handlers(api, fast_path=fast_path)
+
+    def route(path: str, exception):
+        class ErrorResource(Resource):
+            def get(self):
+                raise exception()
+
+        api.add_resource(ErrorResource, path, endpoint=path)
+
+    route("/bad_request", BadRequest)
+    route("/unauthorized", Unauthorized)
+    route("/forbidden", Forbidden)
+    route("/default_error", lambda: Exception("Error message"))
+    route(
+        "/validation_failed",
+        lambda: layaberr.flask_restx.ValidationFailed([], errors=errors),
+    )
+    return app.test_client()
+
+
+# Responses sent as is by layaberr, or going through flask_restx error handling
+fast_path = pytest.mark.parametrize("fast_path", [False, True], ids=["restx", "fast"])
+
+
+@fast_path
+@pytest.mark.parametrize(
+    "path", ["/bad_request", "/unauthorized", "/forbidden", "/default_error"]
+)
+def test_error_handler(benchmark, path, fast_path):
+    client = application(fast_path=fast_path)
+    response = benchmark(client.get, path)
+    assert response.status_code in (400, 401, 403, 500)
+
+
+@fast_path
+def test_failed_validation_handler(benchmark, errors, fast_path):
+    client = application(errors, fast_path)
+    response = benchmark(client.get, "/validation_failed")
+    assert response.status_code == 400
+
+
+@fast_path
+@pytest.mark.parametrize(
+    "exception",
+    [Unauthorized(), Forbidden(), Exception("Error message")],
+    ids=["unauthorized", "forbidden", "default_error"],
+)
+def test_handle_error(benchmark, exception, fast_path):
+    """
+    Error handling only (without routing and test client overhead).
+    """
+    app = Flask(__name__)
+    app.config["ERROR_INCLUDE_MESSAGE"] = False
+    app.logger.disabled = True
+    api = Api(app)
+    layaberr.flask_restx.add_error_handlers(api, fast_path=fast_path)
+
+    def handle_error():
+        try:
+            raise exception
+        except Exception as e:
+            return api.handle_error(e)
+
+    with app.test_request_context("/"):
+        response = benchmark(handle_error)
+    assert response.status_code in (401, 403, 500)
@@ -0,0 +1,29 @@
+"""
+Compare available JSON serializers on error responses.
+
+Run with: python -m pytest benchmarks/bench_serializers.py
+"""
+
+import pytest
+
+from layaberr import serializers
+from layaberr.core import to_list
+
+payloads = {
+    "detail": "No permission -- see authorization schemes",
+    "1k_errors": to_list(
+        {index: {"field": ["Invalid value"]} for index in range(1000)}
+    ),
+}
+
+
+@pytest.mark.parametrize("payload", list(payloads))
+@pytest.mark.parametrize("name", list(serializers.available))
+def test_serializer(benchmark, name, payload):
+    benchmark.group = payload
+    # Time the serializer used by handlers (optional dependencies are imported once set)
+    serializers.set_serializer(name)
+    try:
+        benchmark(serializers.current(), payloads[payload])
+    finally:
+        serializers.set_serializer("json")
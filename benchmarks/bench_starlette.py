@@ -0,0 +1,126 @@
+"""
+Measure layaberr.starlette.exception_handlers and layaberr.asgi.ErrorMiddleware performances.
+
+Run with: python -m pytest benchmarks/bench_starlette.py
+"""
+
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Router
+
+import layaberr.starlette
+from layaberr.asgi import ErrorMiddleware
+
+
+def asgi_client(app):
+    """
+    Send a GET request to the ASGI application, without any network or thread involved.
+    """
+    loop = asyncio.new_event_loop()
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+
+    async def request(path: str) -> list:
+        messages = []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                # Client never disconnects
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        try:
+            await app({**scope, "path": path}, receive, send)
+        except Exception:
+            pass  # Server errors are sent and then raised again
+        return messages
+
+    def get(path: str) -> list:
+        return loop.run_until_complete(request(path))
+
+    return get
+
+
+def application(errors: dict = None, exception_handlers: dict = None):
+    # Asynchronous endpoints, so that thread pool does not take most of the time
+    app = Starlette(
+        exception_handlers=exception_handlers or layaberr.starlette.exception_handlers
+    )
+
+    @app.route("/validation_failed")
+    async def validation_failed(request):
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    @app.route("/unauthorized")
+    async def unauthorized(request):
+        raise layaberr.starlette.Unauthorized
+
+    @app.route("/forbidden")
+    async def forbidden(request):
+        raise layaberr.starlette.Forbidden
+
+    @app.route("/default_error")
+    async def default_error(request):
+        raise Exception("Error message")
+
+    return app
+
+
+def middleware_application(errors: dict = None):
+    """
+    Same routes as application, errors being handled by layaberr.asgi.ErrorMiddleware.
+    """
+    return ErrorMiddleware(Router(application(errors).routes))
+
+
+@pytest.mark.parametrize("path", ["/unauthorized", "/forbidden", "/default_error"])
+def test_http_exception(benchmark, path):
+    get = asgi_client(application())
+    messages = benchmark(get, path)
+    assert messages[0]["status"] in (401, 403, 500)
+
+
+def test_validation_failed(benchmark, errors):
+    get = asgi_client(application(errors))
+    messages = benchmark(get, "/validation_failed")
+    assert messages[0]["status"] == 400
+
+
+def test_streaming_validation_failed(benchmark, errors):
+    exception_handlers = {
+        **layaberr.starlette.exception_handlers,
+        layaberr.starlette.ValidationFailed: layaberr.starlette.streaming_validation_failed_exception,
+    }
+    get = asgi_client(application(errors, exception_handlers))
+    messages = benchmark(get, "/validation_failed")
+    assert messages[0]["status"] == 400
+
+
+@pytest.mark.parametrize("path", ["/unauthorized", "/forbidden", "/default_error"])
+def test_middleware_http_exception(benchmark, path):
+    get = asgi_client(middleware_application())
+    messages = benchmark(get, path)
+    assert messages[0]["status"] in (401, 403, 500)
+
+
+def test_middleware_validation_failed(benchmark, errors):
+    get = asgi_client(middleware_application(errors))
+    messages = benchmark(get, "/validation_failed")
+    assert messages[0]["status"] == 400
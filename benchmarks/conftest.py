@@ -0,0 +1,35 @@
+import pytest
+
+
+def percentile(sorted_data: list, percent: int) -> float:
+    index = min(len(sorted_data) - 1, int(len(sorted_data) * percent / 100))
+    return sorted_data[index]
+
+
+@pytest.fixture(autouse=True)
+def latency_percentiles(request):
+    """
+    Add p50 and p99 latencies (in seconds) to the extra information of every benchmark.
+    Those are available when results are exported (--benchmark-json or --benchmark-save).
+    """
+    yield
+    benchmark = request.node.funcargs.get("benchmark")
+    if benchmark is None or not benchmark.stats:
+        return
+    data = sorted(benchmark.stats.stats.data)
+    benchmark.extra_info["p50"] = percentile(data, 50)
+    benchmark.extra_info["p99"] = percentile(data, 99)
+
+
+def validation_errors(size: int) -> dict:
+    """
+    :return: errors on size items of a received list.
+    """
+    return {
+        index: {"field": ["Invalid value", "Another reason"]} for index in range(size)
+    }
+
+
+@pytest.fixture(params=[1, 1_000, 100_000], ids=lambda size: f"{size}_errors")
+def errors(request) -> dict:
+    return validation_errors(request.param)
@@ -0,0 +1,101 @@
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Mapping
+
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from layaberr import serializers, metrics
+from layaberr.starlette import (
+    ExceptionHandlers,
+    Handler,
+    exception_handlers as default_exception_handlers,
+    http_exception,
+    exception,
+    _dumps_detail,
+)
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_content_type = (b"content-type", b"application/json")
+
+
+async def _send_json(send: Send, status_code: int, body: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                _content_type,
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class ErrorMiddleware:
+    """
+    ASGI middleware sending errors raised by the wrapped ASGI application.
+
+    layaberr.starlette.ValidationFailed, HTTPException (including layaberr.starlette.Unauthorized
+    and layaberr.starlette.Forbidden) and any other Exception are handled the same way as
+    layaberr.starlette.exception_handlers would, without relying on Starlette middlewares.
+
+    HTTP exceptions and unexpected errors are sent directly, without creating a request or a response.
+    Unexpected errors are raised again once sent, for the server to log them.
+    """
+
+    def __init__(self, app: ASGIApp, exception_handlers: Mapping[type, Handler] = None):
+        """
+        :param app: The ASGI application.
+        :param exception_handlers: Handler per exception class (a layaberr.starlette.ExceptionHandlers or any mapping).
+        layaberr.starlette.exception_handlers by default.
+        """
+        self.app = app
+        if exception_handlers is None:
+            exception_handlers = default_exception_handlers
+        self.exception_handlers = ExceptionHandlers(exception_handlers)
+        # Starlette handles HTTPException in its own middleware
+        self.exception_handlers.setdefault(HTTPException, http_exception)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def sender(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, sender)
+        except Exception as exc:
+            if response_started:
+                raise
+
+            handler = self.exception_handlers.resolve(exc.__class__)
+            start = perf_counter()
+            if handler is http_exception:
+                body = _dumps_detail(exc)
+                if metrics.sinks:
+                    metrics.observe(
+                        exc, exc.status_code, perf_counter() - start, len(body)
+                    )
+                await _send_json(send, exc.status_code, body)
+            elif handler is exception or handler is None:
+                body = serializers.dumps(str(exc))
+                if metrics.sinks:
+                    metrics.observe(exc, 500, perf_counter() - start, len(body))
+                await _send_json(send, 500, body)
+                raise
+            else:
+                response = await handler(Request(scope, receive), exc)
+                await response(scope, receive, send)
@@ -0,0 +1,92 @@
+import functools
+import importlib.util
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+# Compression level of gzip encoded bodies (from 1, fastest, to 9, smallest)
+gzip_level = 6
+# Compression quality of brotli encoded bodies (from 0, fastest, to 11, smallest)
+brotli_quality = 4
+
+
+def _gzip_compressor():
+    # 31 window bits: maximum window size, with gzip header and trailer
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def _brotli_compressor():
+    # brotli is an optional dependency, only imported once a body is compressed with it
+    import brotli
+
+    compressor = brotli.Compressor(quality=brotli_quality)
+    return compressor.process, compressor.finish
+
+
+# Function returning a (compress chunk, flush remaining data) tuple, per content coding, by order of preference
+compressors: Dict[str, Callable] = {}
+
+if importlib.util.find_spec("brotli") is not None:
+    compressors["br"] = _brotli_compressor
+
+compressors["gzip"] = _gzip_compressor
+
+
+# Accept-Encoding header values are usually the same for every request sent by a client
+@functools.lru_cache(maxsize=64)
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    :param accept_encoding: Value of the Accept-Encoding request header.
+    :return: The preferred content coding accepted by the client, None if body should not be compressed.
+    """
+    qualities: Dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    preferred, preferred_quality = None, 0.0
+    for coding in compressors:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > preferred_quality:
+            preferred, preferred_quality = coding, quality
+    return preferred
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    """
+    :param coding: Content coding, as returned by layaberr.compression.negotiate.
+    """
+    compress_chunk, flush = compressors[coding]()
+    return compress_chunk(body) + flush()
+
+
+def iter_compressed(chunks: Iterable[bytes], coding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body, chunk by chunk.
+
+    :param coding: Content coding, as returned by layaberr.compression.negotiate.
+    """
+    compress_chunk, flush = compressors[coding]()
+    for chunk in chunks:
+        compressed = compress_chunk(chunk)
+        # Compressor is buffering data until it has enough to compress
+        if compressed:
+            yield compressed
+    yield flush()
+
+
+def headers(coding: Optional[str]) -> Dict[str, str]:
+    """
+    :param coding: Content coding of the body, None if not compressed.
+    :return: Headers of a response that could have been compressed.
+    """
+    if coding is None:
+        return {"Vary": "Accept-Encoding"}
+    return {"Content-Encoding": coding, "Vary": "Accept-Encoding"}
@@ -0,0 +1,727 @@
+import hashlib
+import json
+import reprlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DictErrors = Dict[str, List[str]]
+ListErrors = Dict[int, DictErrors]
+
+
+class ValidationErrors:
+    """
+    Compact container for client data validation errors.
+
+    Errors are stored in parallel arrays (item index, field name id, message id).
+    Field names and messages are only stored once, no matter how many times they are reported.
+    """
+
+    __slots__ = (
+        "_items",
+        "_field_name_ids",
+        "_message_ids",
+        "_field_names",
+        "_messages",
+        "_field_name_index",
+        "_message_index",
+    )
+
+    def __init__(self):
+        self._items = array("q")
+        self._field_name_ids = array("I")
+        self._message_ids = array("I")
+        self._field_names: List[str] = []
+        self._messages: List[str] = []
+        self._field_name_index: Dict[str, int] = {}
+        self._message_index: Dict[str, int] = {}
+
+    def add(self, field_name: str, message: str, item: int = 0) -> None:
+        """
+        Report a validation error.
+
+        :param field_name: Name of the field that could not be validated.
+        :param message: Reason why the validation failed.
+        :param item: Index of the item in received data (if received data is a list).
+        """
+        field_name_id = self._field_name_index.get(field_name)
+        if field_name_id is None:
+            field_name_id = self._field_name_index[field_name] = len(self._field_names)
+            self._field_names.append(field_name)
+
+        message_id = self._message_index.get(message)
+        if message_id is None:
+            message_id = self._message_index[message] = len(self._messages)
+            self._messages.append(message)
+
+        self._items.append(item)
+        self._field_name_ids.append(field_name_id)
+        self._message_ids.append(message_id)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def field_names(self) -> Tuple[str, ...]:
+        """
+        Distinct reported field names, by order of first report.
+        """
+        return tuple(self._field_names)
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """
+        Distinct reported messages, by order of first report.
+        """
+        return tuple(self._messages)
+
+    def __iter__(self) -> Iterator[Tuple[int, str, str]]:
+        """
+        Iterate over reported errors as (item index, field name, message) tuples.
+        """
+        field_names = self._field_names
+        messages = self._messages
+        for item, field_name_id, message_id in zip(
+            self._items, self._field_name_ids, self._message_ids
+        ):
+            yield item, field_names[field_name_id], messages[message_id]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} errors)"
+
+    def to_list(self) -> List[dict]:
+        """
+        Messages are grouped per item and field name, in the order they were first reported.
+        """
+        return list(self.iter_list())
+
+    def iter_list(self) -> Iterator[dict]:
+        """
+        Same as to_list, one error at a time.
+        If errors of every item and field name were reported one after the other (usual case),
+        errors are grouped while they are yielded. Otherwise, only positions of errors are grouped first.
+        """
+        field_names = self._field_names
+        messages = self._messages
+        if self._reported_grouped():
+            error_item = current_key = None
+            for item, field_name_id, message_id in zip(
+                self._items, self._field_name_ids, self._message_ids
+            ):
+                if (item, field_name_id) != current_key:
+                    if error_item is not None:
+                        yield error_item
+                    current_key = item, field_name_id
+                    error_item = {
+                        "item": item + 1,
+                        "field_name": field_names[field_name_id],
+                        "messages": [],
+                    }
+                error_item["messages"].append(messages[message_id])
+            if error_item is not None:
+                yield error_item
+            return
+
+        positions_per_field: Dict[Tuple[int, int], List[int]] = {}
+        for position, key in enumerate(zip(self._items, self._field_name_ids)):
+            positions = positions_per_field.get(key)
+            if positions is None:
+                positions_per_field[key] = [position]
+            else:
+                positions.append(position)
+        message_ids = self._message_ids
+        for (item, field_name_id), positions in positions_per_field.items():
+            yield {
+                "item": item + 1,
+                "field_name": field_names[field_name_id],
+                "messages": [messages[message_ids[position]] for position in positions],
+            }
+
+    def _reported_grouped(self) -> bool:
+        """
+        :return: True if items were reported in order, errors of a field being reported one after the other.
+        Only field names of the current item are kept while checking.
+        """
+        current_item = current_field_name_id = None
+        # Field names of the current item with all their errors reported
+        reported_field_name_ids = set()
+        for item, field_name_id in zip(self._items, self._field_name_ids):
+            if item != current_item:
+                if current_item is not None and item < current_item:
+                    return False
+                current_item, current_field_name_id = item, field_name_id
+                reported_field_name_ids.clear()
+            elif field_name_id != current_field_name_id:
+                if field_name_id in reported_field_name_ids:
+                    return False
+                reported_field_name_ids.add(current_field_name_id)
+                current_field_name_id = field_name_id
+        return True
+
+
+class EncodedErrors:
+    """
+    Errors already encoded as a response body (as validation is performed by another process or library).
+
+    Body is sent as is if the client accepts its media type, and only decoded otherwise.
+    """
+
+    __slots__ = ("body", "media_type")
+
+    def __init__(
+        self,
+        body: Union[bytes, bytearray, memoryview],
+        media_type: str = "application/json",
+    ):
+        """
+        :param body: Encoded errors, as sent by layaberr handlers (a list of errors, or a dictionary
+        containing errors as "errors" key).
+        Memory views are not copied when errors are compressed, and copied once to bytes when sent as is.
+        :param media_type: application/json, application/x-ndjson or application/msgpack.
+        """
+        if isinstance(body, memoryview):
+            # Length of a memory view must be its size in bytes
+            body = body.cast("B")
+        self.body = body
+        self.media_type = media_type
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self.body)} bytes of {self.media_type})"
+
+    def decode(self) -> ValidationErrors:
+        """
+        :return: Decoded errors.
+        """
+        if self.media_type == "application/x-ndjson":
+            lines = bytes(self.body).splitlines()
+            # Last line may contain what is sent alongside errors
+            content = [json.loads(line) for line in lines if line]
+        elif self.media_type == "application/msgpack":
+            import msgpack
+
+            content = msgpack.unpackb(self.body)
+        else:
+            content = json.loads(bytes(self.body))
+        if isinstance(content, dict):
+            content = content["errors"]
+
+        errors = ValidationErrors()
+        for error_item in content:
+            if "field_name" not in error_item:
+                continue
+            for message in error_item["messages"]:
+                errors.add(error_item["field_name"], message, error_item["item"] - 1)
+        return errors
+
+
+class _ReportFull(BaseException):
+    """
+    Stop validation once the maximum number of errors was reported.
+    Not an Exception (as GeneratorExit), so that it is not caught by validators handling any Exception.
+    """
+
+
+class ErrorCollector:
+    """
+    Context manager collecting validation errors.
+
+    ValidationFailed is raised when leaving the context if errors were reported,
+    or as soon as the maximum number of errors is reported (stopping validation).
+    """
+
+    def __init__(
+        self,
+        received_data: Any,
+        exception_class: type,
+        max_errors: Optional[int] = None,
+        fail_fast: bool = False,
+        **exception_options,
+    ):
+        """
+        :param received_data: Data being validated.
+        :param exception_class: The ValidationFailed class to raise.
+        :param max_errors: Maximum number of errors to report. Validation is not stopped by default.
+        :param fail_fast: Stop validation on the first reported error. Same as max_errors=1.
+        :param exception_options: Provided to exception_class alongside received data and errors.
+        """
+        self.received_data = received_data
+        self.exception_class = exception_class
+        self.max_errors = 1 if fail_fast else max_errors
+        self.exception_options = exception_options
+        self.errors = ValidationErrors()
+
+    def add(self, field_name: str, message: str, item: int = 0) -> None:
+        """
+        Report a validation error. See layaberr.core.ValidationErrors.add
+        """
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            # Validation was not stopped (stop signal was caught)
+            raise _ReportFull()
+        self.errors.add(field_name, message, item)
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            raise _ReportFull()
+
+    def __enter__(self) -> "ErrorCollector":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None and not issubclass(exc_type, _ReportFull):
+            return False
+        if self.errors:
+            raise self.exception_class(
+                self.received_data, errors=self.errors, **self.exception_options
+            ) from None
+        return False
+
+
+Errors = Union[ListErrors, DictErrors, ValidationErrors, EncodedErrors]
+
+
+def iter_errors(errors: Errors) -> Iterator[dict]:
+    """
+    Flatten errors, one error per item and field name.
+
+    :param errors: Errors as provided to ValidationFailed.
+    :return: Errors as {"item": ..., "field_name": ..., "messages": [...]} dictionaries.
+    """
+    if isinstance(errors, ValidationErrors):
+        yield from errors.iter_list()
+        return
+    if isinstance(errors, EncodedErrors):
+        yield from errors.decode().iter_list()
+        return
+
+    for field_name_or_index, messages_or_fields in errors.items():
+        if isinstance(messages_or_fields, dict):
+            # Position of the item is the same for all fields of this item
+            item = field_name_or_index + 1
+            for field_name, messages in messages_or_fields.items():
+                yield {"item": item, "field_name": field_name, "messages": messages}
+        else:
+            yield {
+                "item": 1,
+                "field_name": field_name_or_index,
+                "messages": messages_or_fields,
+            }
+
+
+def to_list(errors: Errors) -> List[dict]:
+    """
+    :param errors: Errors as provided to ValidationFailed.
+    :return: Errors as {"item": ..., "field_name": ..., "messages": [...]} dictionaries.
+    """
+    if isinstance(errors, ValidationErrors):
+        return errors.to_list()
+    if isinstance(errors, EncodedErrors):
+        return errors.decode().to_list()
+    return list(iter_errors(errors))
+
+
+def iter_summarized(
+    error_items: Iterable[dict],
+    summary: dict,
+    max_items: Optional[int] = None,
+    max_messages: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Yield the first errors while counting all of them, in a single pass.
+
+    :param error_items: Errors as {"item": ..., "field_name": ..., "messages": [...]} dictionaries.
+    :param summary: Dictionary that will contain the total number of errors ("total")
+    and the number of errors per field name ("fields") once iteration is over.
+    :param max_items: Maximum number of errors to yield. All errors are yielded by default.
+    :param max_messages: Maximum number of messages per error. All messages are kept by default.
+    """
+    total = 0
+    fields: Dict[str, int] = {}
+    for error_item in error_items:
+        total += 1
+        field_name = error_item["field_name"]
+        fields[field_name] = fields.get(field_name, 0) + 1
+        if max_items is not None and total > max_items:
+            continue
+        if max_messages is not None:
+            error_item["messages"] = error_item["messages"][:max_messages]
+        yield error_item
+    summary["total"] = total
+    summary["fields"] = fields
+
+
+def summarize(
+    error_items: Iterable[dict],
+    max_items: Optional[int] = None,
+    max_messages: Optional[int] = None,
+) -> dict:
+    """
+    Keep the first errors and a summary of all errors.
+
+    :param error_items: Errors as {"item": ..., "field_name": ..., "messages": [...]} dictionaries.
+    :param max_items: Maximum number of errors to keep. All errors are kept by default.
+    :param max_messages: Maximum number of messages per error. All messages are kept by default.
+    :return: A dictionary containing kept errors ("errors") and their summary ("summary").
+    """
+    summary = {}
+    errors = list(iter_summarized(error_items, summary, max_items, max_messages))
+    return {"errors": errors, "summary": summary}
+
+
+class MessageCatalog:
+    """
+    Validation messages, registered once with a stable code.
+
+    Codes are then reported as messages (in errors or layaberr.core.ValidationErrors),
+    messages being either inlined in the response or sent once alongside errors.
+    """
+
+    def __init__(self, messages: Dict[str, str] = None):
+        """
+        :param messages: Message per code.
+        """
+        self.messages: Dict[str, str] = dict(messages) if messages else {}
+
+    def register(self, code: str, message: str) -> str:
+        """
+        :param code: Stable code of the message, to be reported instead of the message.
+        :param message: Reason why the validation failed.
+        :return: The code.
+        """
+        self.messages[code] = message
+        return code
+
+    def inline(self, error_items: Iterable[dict]) -> Iterator[dict]:
+        """
+        Replace codes by their message. Unknown codes are considered as messages.
+        """
+        messages = self.messages
+        for error_item in error_items:
+            error_item["messages"] = [
+                messages.get(code, code) for code in error_item["messages"]
+            ]
+            yield error_item
+
+    def collect(
+        self, error_items: Iterable[dict], codes: Dict[str, str]
+    ) -> Iterator[dict]:
+        """
+        Yield errors while collecting message of every reported code (in codes).
+        """
+        messages = self.messages
+        for error_item in error_items:
+            for code in error_item["messages"]:
+                if code not in codes and code in messages:
+                    codes[code] = messages[code]
+            yield error_item
+
+
+def iter_response_errors(
+    errors: Errors,
+    extra: dict,
+    max_items: Optional[int] = None,
+    max_messages: Optional[int] = None,
+    catalog: Optional[MessageCatalog] = None,
+    codes: bool = False,
+    received_data: Any = None,
+    echo_length: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Yield errors to be sent to the client, in a single pass.
+
+    :param errors: Errors as provided to ValidationFailed.
+    :param extra: Dictionary that will contain what must be sent alongside errors once iteration is over.
+    "summary" if max_items or max_messages is provided, "codes" if codes is True.
+    :param max_items: Maximum number of errors to yield. All errors are yielded by default.
+    :param max_messages: Maximum number of messages per error. All messages are kept by default.
+    :param catalog: Message per code, if codes were reported instead of messages.
+    :param codes: Send codes instead of messages, and message per code alongside errors (as "codes").
+    Messages are inlined by default.
+    :param received_data: Data triggering the errors (as retained by ValidationFailed).
+    :param echo_length: Send the received value of every failing field (as "received"), represented in at most
+    echo_length characters. See layaberr.core.iter_echoed. Received values are not sent by default.
+    """
+    error_items = iter_errors(errors)
+    if max_items is not None or max_messages is not None:
+        summary = extra["summary"] = {}
+        error_items = iter_summarized(error_items, summary, max_items, max_messages)
+    if catalog is not None:
+        if codes:
+            error_items = catalog.collect(error_items, extra.setdefault("codes", {}))
+        else:
+            error_items = catalog.inline(error_items)
+    if echo_length is not None:
+        error_items = iter_echoed(error_items, received_data, echo_length)
+    return error_items
+
+
+def response_content(
+    errors: Errors,
+    max_items: Optional[int] = None,
+    max_messages: Optional[int] = None,
+    catalog: Optional[MessageCatalog] = None,
+    codes: bool = False,
+    received_data: Any = None,
+    echo_length: Optional[int] = None,
+) -> Union[List[dict], dict]:
+    """
+    :return: Errors, or a dictionary containing errors ("errors") and what must be sent alongside
+    ("summary" and/or "codes"). See layaberr.core.iter_response_errors.
+    """
+    extra = {}
+    error_items = list(
+        iter_response_errors(
+            errors,
+            extra,
+            max_items,
+            max_messages,
+            catalog,
+            codes,
+            received_data,
+            echo_length,
+        )
+    )
+    if extra:
+        return {"errors": error_items, **extra}
+    return error_items
+
+
+_preview_repr = reprlib.Repr()
+_preview_repr.maxlevel = 4
+_preview_repr.maxdict = 20
+_preview_repr.maxlist = 20
+_preview_repr.maxtuple = 20
+_preview_repr.maxset = 20
+_preview_repr.maxstring = 200
+_preview_repr.maxother = 200
+
+
+def preview(data: Any, length: int) -> str:
+    """
+    Representation of data, without ever rendering it entirely.
+
+    :param data: Data to represent. Only the first elements of containers are represented.
+    :param length: Maximum length of the representation.
+    """
+    representation = _preview_repr.repr(data)
+    if len(representation) > length:
+        return representation[: max(length - 3, 0)] + "..."
+    return representation
+
+
+_digest_encoder = json.JSONEncoder(default=str)
+
+
+def digest(data: Any) -> str:
+    """
+    :return: SHA-256 hexadecimal digest of the JSON representation of data.
+    JSON representation is hashed as it is encoded, without ever being entirely in memory.
+    """
+    hasher = hashlib.sha256()
+    chunks = []
+    size = 0
+    for chunk in _digest_encoder.iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        # Hash encoded chunks (usually a few characters long) by batch of about 4 KB
+        if size >= 4096:
+            hasher.update("".join(chunks).encode("utf-8"))
+            chunks.clear()
+            size = 0
+    hasher.update("".join(chunks).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def offending_items(received_data: Any, errors: Errors) -> Any:
+    """
+    :param received_data: Data triggering the errors.
+    :param errors: Errors as provided to ValidationFailed.
+    :return: Items of received data (if it is a list) or fields (if it is a dictionary) referenced by errors,
+    per index or field name. None if errors are already encoded or if received data is neither a list nor a dictionary.
+    """
+    if isinstance(errors, ValidationErrors):
+        keys = (
+            set(errors._items)
+            if isinstance(received_data, list)
+            else errors._field_names
+        )
+    elif isinstance(errors, dict):
+        keys = errors
+    else:
+        return None
+
+    if isinstance(received_data, list):
+        return {
+            index: received_data[index]
+            for index in keys
+            if isinstance(index, int) and 0 <= index < len(received_data)
+        }
+    if isinstance(received_data, dict):
+        return {field: received_data[field] for field in keys if field in received_data}
+    return None
+
+
+_echo_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def echo(value: Any, max_length: int) -> Any:
+    """
+    :return: The value if its JSON representation is at most max_length characters,
+    its truncated JSON representation otherwise (a truncated string for strings).
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > max_length:
+            return value[: max(max_length - 3, 0)] + "..."
+        return value
+    # Value is only encoded until its representation is too large to be sent as is
+    chunks = []
+    length = 0
+    for chunk in _echo_encoder.iterencode(value):
+        chunks.append(chunk)
+        length += len(chunk)
+        if length > max_length:
+            return "".join(chunks)[: max(max_length - 3, 0)] + "..."
+    return value
+
+
+def _received_item(received_data: Any, index: int) -> Any:
+    if isinstance(received_data, list):
+        return received_data[index] if 0 <= index < len(received_data) else None
+    if isinstance(received_data, dict):
+        # Offending items are retained per index
+        if index in received_data:
+            return received_data[index]
+        return received_data if index == 0 else None
+    return None
+
+
+def iter_echoed(
+    error_items: Iterable[dict], received_data: Any, max_length: int
+) -> Iterator[dict]:
+    """
+    Add the received value of the failing field (as "received") to every error, if received data contains it.
+    Values are looked up directly by item position and field name (received data is never scanned).
+
+    :param error_items: Errors as {"item": ..., "field_name": ..., "messages": [...]} dictionaries.
+    :param received_data: Data triggering the errors (as retained by ValidationFailed).
+    :param max_length: Maximum length of the representation of a value. See layaberr.core.echo.
+    """
+    for error_item in error_items:
+        received_item = _received_item(received_data, error_item["item"] - 1)
+        if isinstance(received_item, dict):
+            field_name = error_item["field_name"]
+            if field_name in received_item:
+                error_item["received"] = echo(received_item[field_name], max_length)
+        yield error_item
+
+
+class Retention:
+    """
+    How much of received data is kept by ValidationFailed exceptions.
+    """
+
+    # Whole received data
+    keep = "keep"
+    # Items (or fields) referenced by errors only, per index (or field name). See layaberr.core.offending_items
+    offending_items = "offending_items"
+    # Preview (bounded representation) of received data only (and its digest if preview_digest is set)
+    preview = "preview"
+    # Nothing
+    drop = "drop"
+
+
+class RetainedReceivedData:
+    """
+    Errors and received data of a ValidationFailed exception, received data being retained according to a
+    layaberr.core.Retention policy.
+    """
+
+    # Maximum length of errors and received data representations
+    preview_length = 1000
+    # Retention of received data when not provided to ValidationFailed
+    default_retention = Retention.keep
+    # Compute the digest of received data before releasing it (Retention.preview), when the exception is created
+    preview_digest = False
+
+    @classmethod
+    def collect(
+        cls,
+        received_data: Union[List, Dict],
+        max_errors: int = None,
+        fail_fast: bool = False,
+        **exception_options,
+    ) -> ErrorCollector:
+        """
+        Collect validation errors, raising ValidationFailed when leaving the context (if errors were reported).
+
+        with ValidationFailed.collect(received_data, max_errors=100) as errors:
+            for index, item in enumerate(received_data):
+                if "key" not in item:
+                    errors.add("key", "Missing data for required field.", item=index)
+
+        :param received_data: Data being validated.
+        :param max_errors: Maximum number of errors to report.
+        Validation is stopped (and ValidationFailed raised) as soon as it is reached. Validation is not stopped by default.
+        :param fail_fast: Stop validation on the first reported error. Same as max_errors=1.
+        :param exception_options: Provided to ValidationFailed (such as retention).
+        """
+        return ErrorCollector(
+            received_data, cls, max_errors, fail_fast, **exception_options
+        )
+
+    def _set_errors(
+        self,
+        received_data: Any,
+        errors: Union[Errors, bytes, bytearray, memoryview, None],
+        message: str,
+        retention: Optional[str],
+    ) -> None:
+        if isinstance(errors, (bytes, bytearray, memoryview)):
+            errors = EncodedErrors(errors)
+        self.errors = errors if errors else {"": [message]}
+        self._retain(received_data, self.errors, retention)
+
+    def _retain(
+        self, received_data: Any, errors: Errors, retention: Optional[str]
+    ) -> None:
+        retention = retention or self.default_retention
+        self._received_data_preview = None
+        self._received_data_digest = None
+        if retention == Retention.keep:
+            self.received_data = received_data
+        elif retention == Retention.offending_items:
+            self.received_data = offending_items(received_data, errors)
+        elif retention == Retention.preview:
+            self.received_data = None
+            self._received_data_preview = preview(received_data, self.preview_length)
+            if self.preview_digest:
+                self._received_data_digest = digest(received_data)
+        elif retention == Retention.drop:
+            self.received_data = None
+            self._received_data_preview = ""
+        else:
+            raise ValueError(
+                f"{retention} retention is not supported. Supported retentions are "
+                f"{[Retention.keep, Retention.offending_items, Retention.preview, Retention.drop]}."
+            )
+        self.retention = retention
+
+    @property
+    def received_data_preview(self) -> str:
+        """
+        Representation of (retained) received data, bounded to preview_length characters.
+        """
+        if self._received_data_preview is None:
+            return preview(self.received_data, self.preview_length)
+        return self._received_data_preview
+
+    @property
+    def received_data_digest(self) -> Optional[str]:
+        """
+        SHA-256 digest of (retained) received data, computed on first access.
+        None if received data was dropped (or only previewed, unless preview_digest is set).
+        """
+        if self._received_data_digest is None and self.retention in (
+            Retention.keep,
+            Retention.offending_items,
+        ):
+            self._received_data_digest = digest(self.received_data)
+        return self._received_data_digest
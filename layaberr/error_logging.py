@@ -0,0 +1,108 @@
+import logging
+import logging.handlers
+import queue
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Hashable, Tuple
+
+
+def fingerprint(exc_info: tuple) -> Tuple[Hashable, ...]:
+    """
+    :param exc_info: Exception information as returned by sys.exc_info().
+    :return: Exception type and location (file and line) where it was raised.
+    """
+    exc_type, _, tb = exc_info
+    if tb is None:
+        return exc_type, None, None
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return exc_type, tb.tb_frame.f_code.co_filename, tb.tb_lineno
+
+
+class DeduplicateExceptions(logging.Filter):
+    """
+    Log the first occurrence of an exception (same type raised at the same location),
+    then only the number of occurrences that were not logged, at most once per interval.
+
+    Records without exception information are always logged.
+    """
+
+    def __init__(self, interval: float = 60.0, max_fingerprints: int = 1024):
+        """
+        :param interval: Minimum number of seconds between two records of the same exception.
+        :param max_fingerprints: Maximum number of distinct exceptions to keep track of.
+        Least recently seen exceptions are forgotten first.
+        """
+        logging.Filter.__init__(self)
+        self.interval = interval
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        # Time of last record and number of filtered records per exception fingerprint
+        self._occurrences = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+
+        key = fingerprint(record.exc_info)
+        now = monotonic()
+        with self._lock:
+            occurrence = self._occurrences.get(key)
+            if occurrence is None:
+                self._occurrences[key] = [now, 0]
+                if len(self._occurrences) > self.max_fingerprints:
+                    self._occurrences.popitem(last=False)
+                return True
+
+            self._occurrences.move_to_end(key)
+            if now - occurrence[0] < self.interval:
+                occurrence[1] += 1
+                return False
+
+            not_logged = occurrence[1]
+            occurrence[0] = now
+            occurrence[1] = 0
+
+        # Traceback was already logged, only report how many times it occurred since
+        record.msg = f"{record.getMessage()} ({record.exc_info[0].__name__} occurred {not_logged + 1} times since last logged)"
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return True
+
+
+def deduplicate(
+    logger: logging.Logger, interval: float = 60.0
+) -> DeduplicateExceptions:
+    """
+    Avoid logging the same exception traceback over and over.
+
+    :param logger: The logger used by the REST API to log unexpected errors.
+    Such as the Flask application logger or "uvicorn.error" logger for Starlette served by uvicorn.
+    :param interval: Minimum number of seconds between two records of the same exception.
+    :return: The filter that was added to the logger.
+    """
+    exceptions_filter = DeduplicateExceptions(interval)
+    logger.addFilter(exceptions_filter)
+    return exceptions_filter
+
+
+def log_in_background(logger: logging.Logger) -> logging.handlers.QueueListener:
+    """
+    Handle records in a background thread, so that logging never blocks on I/O.
+
+    Handlers of the logger are moved to a listener thread, records being sent to them through a queue.
+
+    :param logger: The logger used by the REST API to log unexpected errors.
+    :return: The started listener. Call stop to handle remaining records (on shutdown).
+    """
+    records = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        records, *logger.handlers, respect_handler_level=True
+    )
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    listener.start()
+    return listener
@@ -0,0 +1,186 @@
+import threading
+from collections import Counter
+from itertools import islice
+from time import monotonic
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from layaberr import metrics
+from layaberr.core import ValidationErrors
+
+
+class Fingerprint(NamedTuple):
+    """
+    Structure of an error, shared by every error raised the same way.
+    """
+
+    exception_class: str
+    status_code: int
+    # Names of the fields that could not be validated
+    field_names: FrozenSet[str]
+    # Reported messages (or codes, see layaberr.core.MessageCatalog)
+    codes: FrozenSet[str]
+
+
+def fingerprint(
+    exception: Exception, status_code: int, max_items: int = 100
+) -> Fingerprint:
+    """
+    Compute the fingerprint of a handled exception, without flattening its errors.
+    Already encoded errors are not decoded: their field names and codes are not part of the fingerprint.
+
+    :param exception: The handled exception. Field names and codes are taken from its errors attribute (if any).
+    :param status_code: HTTP status code of the response.
+    :param max_items: Maximum number of dictionary errors entries (items or fields) looked at.
+    Field names and codes of the following ones are not part of the fingerprint, keeping it cheap to compute
+    (on the event loop) whatever the number of errors.
+    """
+    errors = getattr(exception, "errors", None)
+    if isinstance(errors, ValidationErrors):
+        field_names, codes = frozenset(errors.field_names), frozenset(errors.messages)
+    elif isinstance(errors, dict):
+        field_names, codes = set(), set()
+        for field_name_or_index, messages_or_fields in islice(
+            errors.items(), max_items
+        ):
+            if isinstance(messages_or_fields, dict):
+                for field_name, messages in messages_or_fields.items():
+                    field_names.add(field_name)
+                    codes.update(messages)
+            else:
+                field_names.add(field_name_or_index)
+                codes.update(messages_or_fields)
+        field_names, codes = frozenset(field_names), frozenset(codes)
+    else:
+        # No errors or errors of type EncodedErrors
+        field_names = codes = frozenset()
+    return Fingerprint(exception.__class__.__name__, status_code, field_names, codes)
+
+
+class Aggregation(metrics.Sink):
+    """
+    Count handled errors per fingerprint over a sliding window of time.
+
+    The window is split in slots, the oldest slot being discarded as time goes by.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        slots: int = 12,
+        max_fingerprints: int = 1000,
+        max_items: int = 100,
+    ):
+        """
+        :param window: Duration (in seconds) of the window errors are counted over.
+        :param slots: Number of slots the window is split in. The more slots, the smoother the window slides.
+        :param max_fingerprints: Maximum number of distinct fingerprints counted per slot.
+        Errors with other fingerprints are only counted as dropped, keeping memory usage bounded.
+        :param max_items: Maximum number of dictionary errors entries looked at per error.
+        See layaberr.fingerprints.fingerprint.
+        """
+        self.window = window
+        self._slot_duration = window / slots
+        self._lock = threading.Lock()
+        self._counts: List[Counter] = [Counter() for _ in range(slots)]
+        self._dropped: List[int] = [0] * slots
+        # Number of slot durations elapsed (since monotonic clock reference) per slot position
+        self._slot_ids: List[int] = [-1] * slots
+        self.max_fingerprints = max_fingerprints
+        self.max_items = max_items
+
+    def observe(
+        self,
+        exception_class: str,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        self.add(Fingerprint(exception_class, status_code, frozenset(), frozenset()))
+
+    def observe_exception(
+        self,
+        exception: Exception,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        self.add(fingerprint(exception, status_code, self.max_items))
+
+    def add(self, error_fingerprint: Fingerprint) -> None:
+        """
+        Count an error in the current slot.
+        """
+        slot_id = int(monotonic() // self._slot_duration)
+        position = slot_id % len(self._slot_ids)
+        with self._lock:
+            counts = self._counts[position]
+            if self._slot_ids[position] != slot_id:
+                # Slot is reused for the current period of time
+                self._slot_ids[position] = slot_id
+                counts.clear()
+                self._dropped[position] = 0
+            if error_fingerprint in counts or len(counts) < self.max_fingerprints:
+                counts[error_fingerprint] += 1
+            else:
+                self._dropped[position] += 1
+
+    def counts(self) -> Counter:
+        """
+        :return: Number of errors per fingerprint, over the window.
+        """
+        oldest_slot_id = int(monotonic() // self._slot_duration) - len(self._slot_ids)
+        total = Counter()
+        with self._lock:
+            for slot_id, counts in zip(self._slot_ids, self._counts):
+                if slot_id > oldest_slot_id:
+                    total.update(counts)
+        return total
+
+    def dropped(self) -> int:
+        """
+        :return: Number of errors that could not be counted per fingerprint, over the window.
+        """
+        oldest_slot_id = int(monotonic() // self._slot_duration) - len(self._slot_ids)
+        with self._lock:
+            return sum(
+                dropped
+                for slot_id, dropped in zip(self._slot_ids, self._dropped)
+                if slot_id > oldest_slot_id
+            )
+
+    def top(self, count: int = 10) -> Dict[str, object]:
+        """
+        :param count: Maximum number of fingerprints, fields and codes to return.
+        :return: The most frequent fingerprints, failing fields and codes over the window,
+        as a JSON serializable dictionary.
+        """
+        counts = self.counts()
+        field_counts = Counter()
+        code_counts = Counter()
+        for error_fingerprint, fingerprint_count in counts.items():
+            for field_name in error_fingerprint.field_names:
+                field_counts[field_name] += fingerprint_count
+            for code in error_fingerprint.codes:
+                code_counts[code] += fingerprint_count
+        return {
+            "window": self.window,
+            "total": sum(counts.values()) + self.dropped(),
+            "fingerprints": [
+                {
+                    "exception": error_fingerprint.exception_class,
+                    "status": error_fingerprint.status_code,
+                    "field_names": sorted(error_fingerprint.field_names),
+                    "codes": sorted(error_fingerprint.codes),
+                    "count": fingerprint_count,
+                }
+                for error_fingerprint, fingerprint_count in counts.most_common(count)
+            ],
+            "field_names": [
+                {"field_name": field_name, "count": field_count}
+                for field_name, field_count in field_counts.most_common(count)
+            ],
+            "codes": [
+                {"code": code, "count": code_count}
+                for code, code_count in code_counts.most_common(count)
+            ],
+        }
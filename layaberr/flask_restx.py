@@ -1,16 +1,111 @@
-from typing import Union, List, Dict, Type
+from types import MappingProxyType
+from typing import Union, List, Dict, Type, Mapping, TYPE_CHECKING
+import functools
 import logging
 import http
+import sys
+import weakref
+from time import perf_counter
 
-import flask_restx
-from werkzeug.exceptions import Unauthorized, Forbidden, BadRequest
+from layaberr import serializers, metrics, compression, formats
+from layaberr.core import (
+    RetainedReceivedData,
+    EncodedErrors,
+    MessageCatalog,
+    ValidationErrors,
+    to_list,
+    response_content,
+    preview,
+)
 
+if TYPE_CHECKING:  # pragma: no cover
+    # Flask-RestX is only imported when handlers are added (exceptions can be used without it)
+    import flask_restx
 
 logger = logging.getLogger(__name__)
 
 
+def _add_encoded_representation(api: "flask_restx.Api"):
+    """
+    Allow handlers to provide an already encoded flask.Response, skipping flask_restx serialization.
+    """
+    from flask import Response
+
+    output_json = api.representations.get("application/json")
+    if getattr(output_json, "allow_encoded", False):
+        return
+
+    def output_encoded_or_json(data, code, headers=None):
+        if isinstance(data, Response):
+            return data
+        return output_json(data, code, headers)
+
+    output_encoded_or_json.allow_encoded = True
+    api.representations["application/json"] = output_encoded_or_json
+
+
+def _add_fast_path(api: "flask_restx.Api"):
+    """
+    Send responses of fast path handlers as is, skipping flask_restx error handling
+    (response unpacking, content negotiation and representations).
+    Other errors are still handled by flask_restx.
+    """
+    import flask
+
+    handle_error = api.handle_error
+    if getattr(handle_error, "fast_path", False):
+        return
+
+    def handle_error_fast(e):
+        for exception_class, handler in api._own_and_child_error_handlers.items():
+            if isinstance(e, exception_class):
+                break
+        else:
+            handler = None
+        # flask_restx sends data of aborted requests instead of the handler response
+        if not getattr(handler, "fast_path", False) or hasattr(e, "data"):
+            return handle_error(e)
+
+        # Same signal and logging as flask_restx
+        app = flask.current_app._get_current_object()
+        flask.got_request_exception.send(app, exception=e)
+        response, code = handler(e)
+        if not isinstance(response, flask.Response):
+            # Media type without an available layaberr encoding
+            response = api.make_response(response, code)
+        if code >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
+            exc_info = sys.exc_info()
+            app.log_exception(exc_info if exc_info[1] is not None else None)
+        elif code == http.HTTPStatus.UNAUTHORIZED:
+            response = api.unauthorized(response)
+        return response
+
+    handle_error_fast.fast_path = True
+    api.handle_error = handle_error_fast
+
+
+def _compress(body: bytes, compression_threshold: int) -> tuple:
+    """
+    Compress body using the preferred content coding of the client (if body is large enough).
+
+    :return: Body and headers of the response.
+    """
+    import flask
+
+    coding = None
+    if len(body) >= compression_threshold:
+        coding = compression.negotiate(flask.request.headers.get("Accept-Encoding", ""))
+        if coding is not None:
+            body = compression.compress(body, coding)
+    return body, compression.headers(coding)
+
+
 def add_error_handler(
-    api: flask_restx.Api, exception: Type[Exception], http_status: http.HTTPStatus
+    api: "flask_restx.Api",
+    exception: Type[Exception],
+    http_status: http.HTTPStatus,
+    compression_threshold: int = None,
+    fast_path: bool = False,
 ):
     """
     Subscribe error handler for the provided exception class.
@@ -18,23 +113,70 @@ def add_error_handler(
     :param api: The Flask-RestX API that will handle this exception.
     :param exception: The exception class to handle.
     :param http_status: The http.HTTPStatus of the response.
+    :param compression_threshold: Minimum size of the body (in bytes) for it to be compressed
+    (using the preferred content coding of the client, as in Accept-Encoding request header, see layaberr.compression).
+    Bodies are not compressed by default.
+    :param fast_path: Send the response as is, without going through flask_restx error handling.
+    Response is always sent as JSON (whatever the Accept request header). Response goes through flask_restx by default,
+    the already encoded JSON body being only sent if JSON is the negotiated representation.
     :return: A tuple that can be used to document this error handler in flask_restx.
     As in @api.response(*error_response)
     """
+    import flask
+    import flask_restx
+    import werkzeug.exceptions
+
+    _add_encoded_representation(api)
+    if fast_path:
+        _add_fast_path(api)
 
     @api.errorhandler(exception)
     @api.response(
         code=http_status.value, description=None, model=flask_restx.fields.String
     )
     def handle_exception(e):
-        return str(e), http_status.value
+        start = perf_counter()
+        media_type = flask.request.accept_mimetypes.best_match(
+            api.representations, default=api.default_mediatype
+        )
+        if not fast_path and media_type != formats.JSON:
+            # Other representations of the API encode the message themselves
+            if metrics.sinks:
+                metrics.observe(e, http_status.value, perf_counter() - start, None)
+            return str(e), http_status.value
+
+        if (
+            isinstance(e, werkzeug.exceptions.HTTPException)
+            and e.description == e.__class__.description
+        ):
+            # Only default descriptions (such as the ones of Unauthorized and Forbidden) are cached
+            body = serializers.dumps_cached(e.__class__, str(e), http_status.value)
+        else:
+            body = serializers.dumps(str(e))
+        headers = None
+        if compression_threshold is not None:
+            body, headers = _compress(body, compression_threshold)
+        if metrics.sinks:
+            metrics.observe(e, http_status.value, perf_counter() - start, len(body))
+        response = flask.Response(
+            body,
+            status=http_status.value,
+            headers=headers,
+            content_type=formats.JSON,
+        )
+        return response, http_status.value
 
+    handle_exception.fast_path = fast_path
     return http_status.value, http_status.description, flask_restx.fields.String
 
 
-class ValidationFailed(Exception):
+class ValidationFailed(RetainedReceivedData, Exception):
     def __init__(
-        self, received_data: Union[List, Dict], errors: Dict = None, message: str = ""
+        self,
+        received_data: Union[List, Dict],
+        errors: Union[Dict, ValidationErrors, EncodedErrors, bytes, memoryview] = None,
+        message: str = "",
+        retention: str = None,
     ):
         """
         Represent a client data validation error.
@@ -47,85 +189,281 @@ class ValidationFailed(Exception):
         If received_data is a dict:
             key is supposed to be the field name in error
             value is supposed to be a list of error messages on this field
+            Can also be a layaberr.core.ValidationErrors instance.
+        Can also be already encoded errors, sent as is: a layaberr.core.EncodedErrors instance or JSON bytes.
         :param message: The error message in case errors cannot be provided.
+        :param retention: How much of received data is kept, see layaberr.core.Retention.
+        default_retention (Retention.keep unless changed) by default.
         """
-        self.received_data = received_data
-        self.errors = errors if errors else {"": [message]}
+        self._set_errors(received_data, errors, message, retention)
 
     def __str__(self):
-        return f"Errors: {self.errors}\nReceived: {self.received_data}"
+        return f"Errors: {preview(self.errors, self.preview_length)}\nReceived: {self.received_data_preview}"
 
     @staticmethod
-    def to_list(errors: dict) -> List[dict]:
-        error_list = []
-        for field_name_or_index, messages_or_fields in errors.items():
-            if isinstance(messages_or_fields, dict):
-                error_list.extend(
-                    [
-                        {
-                            "item": field_name_or_index + 1,
-                            "field_name": field_name,
-                            "messages": messages,
-                        }
-                        for field_name, messages in messages_or_fields.items()
-                    ]
-                )
-            else:
-                error_list.append(
-                    {
-                        "item": 1,
-                        "field_name": field_name_or_index,
-                        "messages": messages_or_fields,
-                    }
-                )
-        return error_list
+    def to_list(errors: Union[Dict, ValidationErrors]) -> List[dict]:
+        return to_list(errors)
 
     @staticmethod
-    def list_item_model():
-        return {
-            "item": flask_restx.fields.Integer(
-                description="Position of the item that could not be validated.",
-                example=1,
-            ),
-            "field_name": flask_restx.fields.String(
-                description="Name of the field that could not be validated.",
-                example="sample_field_name",
-            ),
-            "messages": flask_restx.fields.List(
-                flask_restx.fields.String(
-                    description="Reason why the validation failed.",
-                    example="This is the reason why this field was not validated.",
-                )
-            ),
-        }
+    @functools.lru_cache(maxsize=None)
+    def list_item_model() -> Mapping:
+        """
+        Fields are only created once and shared by every API.
+        """
+        import flask_restx
+
+        return MappingProxyType(
+            {
+                "item": flask_restx.fields.Integer(
+                    description="Position of the item that could not be validated.",
+                    example=1,
+                ),
+                "field_name": flask_restx.fields.String(
+                    description="Name of the field that could not be validated.",
+                    example="sample_field_name",
+                ),
+                "messages": flask_restx.fields.List(
+                    flask_restx.fields.String(
+                        description="Reason why the validation failed.",
+                        example="This is the reason why this field was not validated.",
+                    )
+                ),
+            }
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def echoed_list_item_model() -> Mapping:
+        """
+        Fields are only created once and shared by every API.
+        """
+        import flask_restx
+
+        return MappingProxyType(
+            {
+                **ValidationFailed.list_item_model(),
+                "received": flask_restx.fields.Raw(
+                    description="Received value of the field (truncated if too large).",
+                    example="sample value",
+                ),
+            }
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def summary_model() -> Mapping:
+        """
+        Fields are only created once and shared by every API.
+        """
+        import flask_restx
+
+        return MappingProxyType(
+            {
+                "total": flask_restx.fields.Integer(
+                    description="Total number of errors.", example=1
+                ),
+                "fields": flask_restx.fields.Raw(
+                    description="Number of errors per field name.",
+                    example={"sample_field_name": 1},
+                ),
+            }
+        )
 
 
-def add_failed_validation_handler(api: flask_restx.Api):
+def add_failed_validation_handler(
+    api: "flask_restx.Api",
+    max_items: int = None,
+    max_messages: int = None,
+    catalog: MessageCatalog = None,
+    codes: bool = False,
+    compression_threshold: int = None,
+    echo_length: int = None,
+    fast_path: bool = False,
+):
     """
     Subscribe error handler for the layaberr.flask_restx.ValidationFailed exception.
 
     :param api: The Flask-RestX API that will handle this exception.
+    :param max_items: Maximum number of errors sent to the client. All errors are sent by default.
+    :param max_messages: Maximum number of messages sent per error. All messages are sent by default.
+    If max_items or max_messages is provided, errors will be sent alongside a summary
+    (total number of errors and number of errors per field name).
+    :param catalog: Message per code, if codes were reported instead of messages (see layaberr.core.MessageCatalog).
+    :param codes: Send codes (instead of messages) and the message of every reported code (as "codes").
+    Requires a catalog. Messages are sent instead of codes by default.
+    :param compression_threshold: Minimum size of the body (in bytes) for it to be compressed
+    (using the preferred content coding of the client, as in Accept-Encoding request header, see layaberr.compression).
+    Body is then encoded by layaberr.serializers instead of Flask-RestX. Bodies are not compressed by default.
+    Errors are sent as NDJSON or MessagePack (if msgpack is installed) instead of JSON if requested by the client
+    (Accept request header), see layaberr.formats.
+    :param echo_length: Send the received value of every failing field (as "received"), looked up in
+    ValidationFailed.received_data. Values represented in more than echo_length characters are truncated.
+    Received values are not sent by default. Already encoded errors are sent without received values.
+    :param fast_path: Encode the body using layaberr.serializers and send the response as is,
+    without going through flask_restx error handling. Response goes through flask_restx by default.
     :return: A tuple that can be used to document this error handler in flask_restx.
     As in @api.response(*error_response)
     """
-    list_item_model = api.model("ValidationFailed", ValidationFailed.list_item_model())
+    import flask
+    import flask_restx
+
+    if codes and catalog is None:
+        raise ValueError("A message catalog is required to send codes.")
+
+    _add_encoded_representation(api)
+    if fast_path:
+        _add_fast_path(api)
+
+    summarized = max_items is not None or max_messages is not None
+    echoed = echo_length is not None
+    if echoed:
+        list_item_model = api.model(
+            "EchoedValidationFailed", ValidationFailed.echoed_list_item_model()
+        )
+    else:
+        list_item_model = api.model(
+            "ValidationFailed", ValidationFailed.list_item_model()
+        )
+    if summarized or codes:
+        response_fields = {
+            "errors": flask_restx.fields.List(
+                flask_restx.fields.Nested(list_item_model)
+            )
+        }
+        if summarized:
+            summary_model = api.model(
+                "ValidationFailedSummary", ValidationFailed.summary_model()
+            )
+            response_fields["summary"] = flask_restx.fields.Nested(summary_model)
+        if codes:
+            response_fields["codes"] = flask_restx.fields.Raw(
+                description="Message per code reported in errors messages.",
+                example={
+                    "sample_code": "This is the reason why this field was not validated."
+                },
+            )
+        response_model = api.model(
+            f"{'Summarized' if summarized else ''}{'Coded' if codes else ''}{'Echoed' if echoed else ''}ValidationFailed",
+            response_fields,
+        )
+    else:
+        response_model = [list_item_model]
+
+    if catalog is None and not summarized and not echoed:
+        to_response = ValidationFailed.to_list
+    else:
+        to_response = functools.partial(
+            response_content,
+            max_items=max_items,
+            max_messages=max_messages,
+            catalog=catalog,
+            codes=codes,
+            echo_length=echo_length,
+        )
 
     @api.errorhandler(ValidationFailed)
     @api.response(
         code=http.HTTPStatus.BAD_REQUEST.value,
         description=None,
-        model=[list_item_model],
+        model=response_model,
     )
     def handle_exception(failed_validation):
-        return (
-            ValidationFailed.to_list(failed_validation.errors),
-            http.HTTPStatus.BAD_REQUEST.value,
+        start = perf_counter()
+        # Other formats are only encoded by layaberr (not registered as API representations)
+        media_type = flask.request.accept_mimetypes.best_match(
+            [*api.representations, *formats.available], default=api.default_mediatype
         )
+        errors = failed_validation.errors
+        body = None
+        if isinstance(errors, EncodedErrors):
+            if media_type == errors.media_type:
+                body = errors.body
+            else:
+                # Errors are only decoded if the client requires another media type
+                errors = errors.decode()
+
+        if body is None and (
+            media_type in formats.available
+            and (
+                media_type != formats.JSON
+                or compression_threshold is not None
+                or fast_path
+            )
+        ):
+            body = formats.render(
+                errors,
+                media_type,
+                max_items,
+                max_messages,
+                catalog,
+                codes,
+                received_data=failed_validation.received_data,
+                echo_length=echo_length,
+            )
+
+        if body is not None:
+            headers = {}
+            if compression_threshold is not None:
+                body, headers = _compress(body, compression_threshold)
+            if metrics.sinks:
+                metrics.observe(
+                    failed_validation,
+                    http.HTTPStatus.BAD_REQUEST.value,
+                    perf_counter() - start,
+                    len(body),
+                )
+            if not isinstance(body, bytes):
+                # WSGI servers only send bytes (PEP 3333)
+                body = bytes(body)
+            response = flask.Response(
+                body,
+                status=http.HTTPStatus.BAD_REQUEST.value,
+                headers={**headers, "Content-Length": str(len(body))},
+                mimetype=media_type,
+            )
+            if media_type not in api.representations:
+                # Flask-RestX sets the media type of one of its representations
+                @flask.after_this_request
+                def restore_media_type(sent_response):
+                    sent_response.mimetype = media_type
+                    return sent_response
 
-    return http.HTTPStatus.BAD_REQUEST.value, "Validation failed.", [list_item_model]
+            return response, http.HTTPStatus.BAD_REQUEST.value
 
+        if echoed:
+            response = to_response(
+                errors, received_data=failed_validation.received_data
+            )
+        else:
+            response = to_response(errors)
+        if metrics.sinks:
+            # Body is encoded by Flask-RestX, its size is not known here
+            metrics.observe(
+                failed_validation,
+                http.HTTPStatus.BAD_REQUEST.value,
+                perf_counter() - start,
+                None,
+            )
+        return response, http.HTTPStatus.BAD_REQUEST.value
 
-def add_error_handlers(api: flask_restx.Api) -> Dict[str, dict]:
+    handle_exception.fast_path = fast_path
+    return (
+        http.HTTPStatus.BAD_REQUEST.value,
+        f"Validation failed. Sent as {', '.join(formats.available)} according to Accept request header.",
+        response_model,
+    )
+
+
+# Documentation of error handlers per API and failed validation options
+_error_responses = weakref.WeakKeyDictionary()
+
+
+def add_error_handlers(
+    api: "flask_restx.Api",
+    compression_threshold: int = None,
+    fast_path: bool = False,
+    **failed_validation_options,
+) -> Dict[str, dict]:
     """
     Subscribe error handlers for:
         * werkzeug.exceptions.BadRequest
@@ -135,16 +473,53 @@ def add_error_handlers(api: flask_restx.Api) -> Dict[str, dict]:
         * Exception
 
     :param api: The Flask-RestX API that will handle those exceptions.
+    :param compression_threshold: Minimum size of bodies (in bytes) for them to be compressed. Not compressed by default.
+    :param fast_path: Send responses as is, without going through flask_restx error handling.
+    Responses go through flask_restx by default. See layaberr.flask_restx.add_error_handler.
+    :param failed_validation_options: Provided to layaberr.flask_restx.add_failed_validation_handler.
     :return: A dictionary that can be used to document those error handlers in flask_restx.
-    As in @api.doc(**error_responses)
+    As in @api.doc(**error_responses) or layaberr.flask_restx.add_error_responses(namespace, error_responses)
+    Handlers are only subscribed once per API, the same dictionary being returned on subsequent calls.
     """
-    add_error_handler(api, BadRequest, http.HTTPStatus.BAD_REQUEST)
-    failed_validation = add_failed_validation_handler(api)
-    unauthorized = add_error_handler(api, Unauthorized, http.HTTPStatus.UNAUTHORIZED)
-    forbidden = add_error_handler(api, Forbidden, http.HTTPStatus.FORBIDDEN)
-    exception = add_error_handler(api, Exception, http.HTTPStatus.INTERNAL_SERVER_ERROR)
+    from werkzeug.exceptions import Unauthorized, Forbidden, BadRequest
+
+    options_key = (
+        compression_threshold,
+        fast_path,
+        *sorted(failed_validation_options.items()),
+    )
+    api_error_responses = _error_responses.setdefault(api, {})
+    if options_key in api_error_responses:
+        return api_error_responses[options_key]
 
-    return {
+    add_error_handler(
+        api, BadRequest, http.HTTPStatus.BAD_REQUEST, compression_threshold, fast_path
+    )
+    failed_validation = add_failed_validation_handler(
+        api,
+        compression_threshold=compression_threshold,
+        fast_path=fast_path,
+        **failed_validation_options,
+    )
+    unauthorized = add_error_handler(
+        api,
+        Unauthorized,
+        http.HTTPStatus.UNAUTHORIZED,
+        compression_threshold,
+        fast_path,
+    )
+    forbidden = add_error_handler(
+        api, Forbidden, http.HTTPStatus.FORBIDDEN, compression_threshold, fast_path
+    )
+    exception = add_error_handler(
+        api,
+        Exception,
+        http.HTTPStatus.INTERNAL_SERVER_ERROR,
+        compression_threshold,
+        fast_path,
+    )
+
+    error_responses = api_error_responses[options_key] = {
         "responses": {
             failed_validation[0]: (failed_validation[1], failed_validation[2]),
             unauthorized[0]: (unauthorized[1], unauthorized[2]),
@@ -152,3 +527,80 @@ def add_error_handlers(api: flask_restx.Api) -> Dict[str, dict]:
             exception[0]: (exception[1], exception[2]),
         }
     }
+    return error_responses
+
+
+def _documented_resource(resource: type, error_responses: Dict[str, dict]) -> type:
+    doc = getattr(resource, "__apidoc__", {})
+    if doc is False:
+        return resource
+    # Resource class can be added to other namespaces, it is documented on a subclass
+    return type(
+        resource.__name__,
+        (resource,),
+        {
+            "__module__": resource.__module__,
+            "__qualname__": resource.__qualname__,
+            "__doc__": resource.__doc__,
+            "__apidoc__": {
+                **doc,
+                "responses": {
+                    **error_responses["responses"],
+                    **doc.get("responses", {}),
+                },
+            },
+        },
+    )
+
+
+def add_error_responses(
+    namespace: "flask_restx.Namespace", error_responses: Dict[str, dict]
+):
+    """
+    Document error responses on every resource of a namespace, including resources added afterwards.
+    Same as @namespace.doc(**error_responses) on every resource, without modifying resource classes
+    (a resource class added to several namespaces is only documented in this one).
+    Responses documented on a resource take precedence.
+
+    :param namespace: The Flask-RestX namespace (api.default_namespace for resources added on the API itself).
+    :param error_responses: As returned by layaberr.flask_restx.add_error_handlers.
+    """
+    # Only the documentation of resources already added is changed (views are already registered)
+    namespace.resources[:] = [
+        resource_route._replace(
+            resource=_documented_resource(resource_route.resource, error_responses)
+        )
+        for resource_route in namespace.resources
+    ]
+
+    add_resource = namespace.add_resource
+
+    def add_documented_resource(resource, *urls, **kwargs):
+        return add_resource(
+            _documented_resource(resource, error_responses), *urls, **kwargs
+        )
+
+    namespace.add_resource = add_documented_resource
+
+
+def add_aggregation_resource(
+    api: "flask_restx.Api",
+    aggregation: "layaberr.fingerprints.Aggregation",
+    path: str = "/errors",
+):
+    """
+    Add a resource sending the most frequent errors (as layaberr.fingerprints.Aggregation.top).
+    Number of fingerprints, fields and codes can be provided as "top" query parameter (10 by default).
+
+    :param api: The Flask-RestX API (or namespace) the resource will be added to.
+    :param aggregation: The aggregation, added as a metrics sink (see layaberr.metrics.add_sink).
+    :param path: Path of the resource.
+    """
+    import flask
+    import flask_restx
+
+    class ErrorsAggregation(flask_restx.Resource):
+        def get(self):
+            return aggregation.top(flask.request.args.get("top", 10, type=int))
+
+    api.add_resource(ErrorsAggregation, path)
@@ -0,0 +1,133 @@
+import functools
+import importlib.util
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from layaberr import serializers
+from layaberr.core import Errors, MessageCatalog, iter_response_errors, response_content
+
+JSON = "application/json"
+# One error per line, followed by a line with what is sent alongside errors (summary, codes) if any
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+
+# Media types of validation errors responses, by order of preference
+available = [JSON, NDJSON]
+
+# msgpack is an optional dependency, only imported once a body is encoded with it
+if importlib.util.find_spec("msgpack") is not None:
+    available.append(MSGPACK)
+
+
+# Accept header values are usually the same for every request sent by a client
+@functools.lru_cache(maxsize=64)
+def _qualities(accept: str) -> Dict[str, float]:
+    qualities: Dict[str, float] = {}
+    for media_range in accept.split(","):
+        media_type, _, parameters = media_range.partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.strip().lower()] = quality
+    return qualities
+
+
+def _quality(qualities: Dict[str, float], media_type: str) -> float:
+    return qualities.get(
+        media_type, qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+
+
+def negotiate(accept: str) -> str:
+    """
+    :param accept: Value of the Accept request header.
+    :return: The preferred available media type accepted by the client, JSON if none is accepted.
+    """
+    qualities = _qualities(accept)
+    preferred, preferred_quality = JSON, 0.0
+    for media_type in available:
+        quality = _quality(qualities, media_type)
+        if quality > preferred_quality:
+            preferred, preferred_quality = media_type, quality
+    return preferred
+
+
+def accepts(accept: str, media_type: str) -> bool:
+    """
+    :param accept: Value of the Accept request header. Every media type is accepted if empty.
+    :return: True if the client accepts this media type.
+    """
+    return not accept or _quality(_qualities(accept), media_type) > 0
+
+
+def iter_ndjson(
+    error_items: Iterable[dict],
+    extra: dict,
+    chunk_size: int,
+    dumps: Optional[serializers.Serializer] = None,
+) -> Iterator[bytes]:
+    """
+    Encode errors as JSON lines, yielding one chunk of bytes every chunk_size errors.
+    What must be sent alongside errors (computed while errors are encoded) is sent as the last line.
+
+    :param dumps: JSON serializer. Configured serializer by default.
+    """
+    dumps = dumps or serializers.dumps
+    chunk = []
+    for error_item in error_items:
+        chunk.append(dumps(error_item))
+        if len(chunk) == chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if extra:
+        chunk.append(dumps(extra))
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def render(
+    errors: Errors,
+    media_type: str,
+    max_items: Optional[int] = None,
+    max_messages: Optional[int] = None,
+    catalog: Optional[MessageCatalog] = None,
+    codes: bool = False,
+    dumps: Optional[serializers.Serializer] = None,
+    received_data: Any = None,
+    echo_length: Optional[int] = None,
+) -> bytes:
+    """
+    Encode validation errors response.
+
+    :param errors: Errors as provided to ValidationFailed.
+    :param media_type: One of the available media types.
+    :param dumps: JSON serializer. Configured serializer by default.
+    See layaberr.core.iter_response_errors for other parameters.
+    """
+    dumps = dumps or serializers.dumps
+    if media_type == NDJSON:
+        extra = {}
+        error_items = iter_response_errors(
+            errors,
+            extra,
+            max_items,
+            max_messages,
+            catalog,
+            codes,
+            received_data,
+            echo_length,
+        )
+        return b"".join(iter_ndjson(error_items, extra, 1000, dumps))
+
+    content = response_content(
+        errors, max_items, max_messages, catalog, codes, received_data, echo_length
+    )
+    if media_type == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(content)
+    return dumps(content)
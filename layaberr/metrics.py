@@ -0,0 +1,307 @@
+import abc
+import mmap
+import os
+import struct
+import threading
+import uuid
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Sink(abc.ABC):
+    """
+    Receive a measure for every error handled by layaberr handlers.
+    """
+
+    @abc.abstractmethod
+    def observe(
+        self,
+        exception_class: str,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        """
+        :param exception_class: Name of the handled exception class.
+        :param status_code: HTTP status code of the response.
+        :param duration: Time spent building the response body (in seconds).
+        :param size: Size of the response body (in bytes).
+        None if the body is encoded by the framework, after the handler.
+        """
+
+    def observe_exception(
+        self,
+        exception: Exception,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        """
+        Receive the handled exception itself, for sinks requiring more than its class.
+        Forwarded to observe by default.
+        """
+        self.observe(exception.__class__.__name__, status_code, duration, size)
+
+
+# Sinks receiving measures. Errors are not measured if there is no sink.
+sinks: List[Sink] = []
+
+
+def add_sink(sink: Sink) -> Sink:
+    sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    sinks.remove(sink)
+
+
+def observe(
+    exception: Exception, status_code: int, duration: float, size: Optional[int]
+) -> None:
+    for sink in sinks:
+        sink.observe_exception(exception, status_code, duration, size)
+
+
+def measure_chunks(
+    chunks: Iterable[bytes], exception: Exception, status_code: int, start: float
+) -> Iterator[bytes]:
+    """
+    Observe a streamed response body once it has been entirely produced.
+
+    :param start: time.perf_counter() value when body started to be built.
+    """
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+    observe(exception, status_code, perf_counter() - start, size)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        """
+        :param buckets: Upper bounds (inclusive) of buckets, sorted.
+        """
+        self.buckets = buckets
+        # Last count is for values above all buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        cumulative_counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative_counts.append(total)
+        return cumulative_counts
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _counter_lines(lines: List[str], counts: Dict[Tuple[str, int], int]) -> None:
+    lines.append("# TYPE layaberr_errors_total counter")
+    for (exception_class, status_code), count in counts.items():
+        lines.append(
+            f'layaberr_errors_total{{exception="{_escape(exception_class)}",status="{status_code}"}} {count}'
+        )
+
+
+class InMemorySink(Sink):
+    """
+    Count errors and keep histograms of body building duration and body size, per exception class and status code.
+    """
+
+    duration_buckets = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+    size_buckets = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[Tuple[str, int], int] = {}
+        self.durations: Dict[Tuple[str, int], Histogram] = {}
+        self.sizes: Dict[Tuple[str, int], Histogram] = {}
+
+    def observe(
+        self,
+        exception_class: str,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        key = exception_class, status_code
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            durations = self.durations.get(key)
+            if durations is None:
+                durations = self.durations[key] = Histogram(self.duration_buckets)
+            durations.observe(duration)
+            if size is not None:
+                sizes = self.sizes.get(key)
+                if sizes is None:
+                    sizes = self.sizes[key] = Histogram(self.size_buckets)
+                sizes.observe(size)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Measures in Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            _counter_lines(lines, self.counts)
+            self._histogram_lines(
+                lines, "layaberr_error_duration_seconds", self.durations
+            )
+            self._histogram_lines(lines, "layaberr_error_size_bytes", self.sizes)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(
+        lines: List[str], name: str, histograms: Dict[Tuple[str, int], Histogram]
+    ) -> None:
+        lines.append(f"# TYPE {name} histogram")
+        for (exception_class, status_code), histogram in histograms.items():
+            labels = f'exception="{_escape(exception_class)}",status="{status_code}"'
+            cumulative_counts = histogram.cumulative_counts()
+            for bucket, count in zip(histogram.buckets, cumulative_counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bucket}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+class CallbackSink(Sink):
+    """
+    Forward measures to a StatsD-like callback.
+    """
+
+    def __init__(self, callback: Callable[[str, float, str, Dict[str, str]], None]):
+        """
+        :param callback: Called with metric name, value, metric type ("c" for counters, "ms" for timers, "h" for histograms) and tags.
+        """
+        self.callback = callback
+
+    def observe(
+        self,
+        exception_class: str,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        tags = {"exception": exception_class, "status": str(status_code)}
+        self.callback("layaberr.errors", 1, "c", tags)
+        self.callback("layaberr.error_duration", duration * 1000, "ms", tags)
+        if size is not None:
+            self.callback("layaberr.error_size", size, "h", tags)
+
+
+class SharedMemorySink(Sink):
+    """
+    Count errors per exception class and status code, across processes (such as pre-forked server workers).
+
+    Every process counts errors in its own memory mapped file of the directory, without locking other processes.
+    Counts of every process (including exited ones) are summed when read.
+    """
+
+    # Number of counted errors (unsigned 64 bits integer)
+    _header = struct.Struct("<Q")
+    # Status code, length of exception class name, exception class name, count
+    _entry = struct.Struct("<HB117sQ")
+
+    def __init__(self, directory: str, max_keys: int = 256):
+        """
+        :param directory: Existing directory shared by every process. It should be emptied when the server starts.
+        Every process (and every sink) counts in its own file, existing files are never overwritten.
+        :param max_keys: Maximum number of exception class and status code combinations counted per process.
+        Errors with other combinations are not counted.
+        """
+        self.directory = directory
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._pid = None
+        self._mmap = None
+        self._offsets: Dict[Tuple[str, int], int] = {}
+
+    def _open(self) -> mmap.mmap:
+        # Processes forked after the sink was created must not share the parent file
+        self._pid = os.getpid()
+        self._offsets = {}
+        # A reused process identifier, or another sink of this process, must not overwrite existing counts
+        path = os.path.join(
+            self.directory, f"layaberr_{self._pid}_{uuid.uuid4().hex}.db"
+        )
+        file_descriptor = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.ftruncate(
+                file_descriptor, self._header.size + self.max_keys * self._entry.size
+            )
+            self._mmap = mmap.mmap(file_descriptor, 0)
+        finally:
+            os.close(file_descriptor)
+        return self._mmap
+
+    def observe(
+        self,
+        exception_class: str,
+        status_code: int,
+        duration: float,
+        size: Optional[int],
+    ) -> None:
+        key = exception_class, status_code
+        with self._lock:
+            shared = self._mmap if self._pid == os.getpid() else self._open()
+            offset = self._offsets.get(key)
+            if offset is None:
+                if len(self._offsets) == self.max_keys:
+                    return
+                offset = self._header.size + len(self._offsets) * self._entry.size
+                name = exception_class.encode("utf-8")[:117]
+                self._entry.pack_into(shared, offset, status_code, len(name), name, 0)
+                self._offsets[key] = offset
+                # Entry is only visible to readers once entirely written
+                self._header.pack_into(shared, 0, len(self._offsets))
+            count_offset = offset + self._entry.size - 8
+            (count,) = struct.unpack_from("<Q", shared, count_offset)
+            struct.pack_into("<Q", shared, count_offset, count + 1)
+
+    def counts(self) -> Dict[Tuple[str, int], int]:
+        """
+        :return: Number of errors per exception class and status code, summed across processes.
+        """
+        counts: Dict[Tuple[str, int], int] = {}
+        for file_name in os.listdir(self.directory):
+            if not (file_name.startswith("layaberr_") and file_name.endswith(".db")):
+                continue
+            with open(os.path.join(self.directory, file_name), "rb") as file:
+                content = file.read()
+            if len(content) < self._header.size:
+                # File of a process that is starting
+                continue
+            (entries,) = self._header.unpack_from(content, 0)
+            for offset in range(
+                self._header.size,
+                self._header.size + entries * self._entry.size,
+                self._entry.size,
+            ):
+                status_code, length, name, count = self._entry.unpack_from(
+                    content, offset
+                )
+                key = name[:length].decode("utf-8", errors="ignore"), status_code
+                counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Error counts of every process in Prometheus text exposition format.
+        """
+        lines = []
+        _counter_lines(lines, self.counts())
+        return "\n".join(lines) + "\n"
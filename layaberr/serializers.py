@@ -0,0 +1,137 @@
+import functools
+import importlib.util
+import json
+from typing import Any, Callable, Dict, Hashable, Union
+
+Serializer = Callable[[Any], bytes]
+
+
+def stdlib_dumps(content: Any) -> bytes:
+    # Same encoding as starlette.responses.JSONResponse
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class _Lazy:
+    """
+    Serializer relying on an optional dependency, only imported on first use.
+    """
+
+    def __init__(self, load: Callable[[], Serializer]):
+        self._load = load
+        self._serializer: Serializer = None
+
+    def load(self) -> Serializer:
+        """
+        :return: The serializer of the optional dependency, imported (and created) once.
+        """
+        if self._serializer is None:
+            self._serializer = self._load()
+        return self._serializer
+
+    def __call__(self, content: Any) -> bytes:
+        return self.load()(content)
+
+
+def _orjson() -> Serializer:
+    import orjson
+
+    return orjson.dumps
+
+
+def _msgspec() -> Serializer:
+    import msgspec
+
+    return msgspec.json.Encoder().encode
+
+
+# Serializers that can be used, per name
+available: Dict[str, Serializer] = {"json": stdlib_dumps}
+
+# Optional dependencies are only looked up (not imported) to keep import time low
+if importlib.util.find_spec("orjson") is not None:
+    available["orjson"] = _Lazy(_orjson)
+
+if importlib.util.find_spec("msgspec") is not None:
+    available["msgspec"] = _Lazy(_msgspec)
+
+_serializer: Serializer = stdlib_dumps
+
+
+def set_serializer(serializer: Union[str, Serializer]) -> None:
+    """
+    Change the JSON serializer used to render error responses.
+
+    :param serializer: A callable converting content to JSON bytes, or the name of an available serializer.
+    Standard library json module is used by default.
+    """
+    global _serializer
+    if isinstance(serializer, str):
+        if serializer not in available:
+            raise ValueError(
+                f"{serializer} serializer is not available. Available serializers are {list(available)}."
+            )
+        serializer = available[serializer]
+    if isinstance(serializer, _Lazy):
+        # Import the optional dependency once, instead of on every call
+        serializer = serializer.load()
+    _serializer = serializer
+
+
+def current() -> Serializer:
+    """
+    :return: The configured serializer.
+    """
+    return _serializer
+
+
+def fastest() -> str:
+    """
+    :return: Name of the fastest available serializer.
+    """
+    for name in ("orjson", "msgspec"):
+        if name in available:
+            return name
+    return "json"
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Convert content to JSON using the configured serializer.
+    """
+    return _serializer(content)
+
+
+# At most 256 encoded error bodies are kept in cache (least recently used are discarded)
+@functools.lru_cache(maxsize=256)
+def _dumps_cached(
+    exception_class: type, detail: Hashable, status_code: int, serializer: Serializer
+) -> bytes:
+    return serializer(detail)
+
+
+def dumps_cached(exception_class: type, detail: Any, status_code: int) -> bytes:
+    """
+    Convert error detail to JSON using the configured serializer.
+    Encoded bodies are cached per exception class, detail and status code,
+    sparing the serialization of errors that are raised with the same detail over and over.
+
+    :param exception_class: The class of the exception to render.
+    :param detail: The error detail that will be sent as response body.
+    :param status_code: The HTTP status code of the response.
+    """
+    if not isinstance(detail, str):
+        return _serializer(detail)
+    return _dumps_cached(exception_class, detail, status_code, _serializer)
+
+
+def cache_info():
+    """
+    :return: Hits, misses, maximum and current size of the encoded error bodies cache.
+    """
+    return _dumps_cached.cache_info()
+
+
+def cache_clear() -> None:
+    _dumps_cached.cache_clear()
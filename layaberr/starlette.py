@@ -1,9 +1,37 @@
+import asyncio
+import textwrap
+from collections.abc import MutableMapping
+from concurrent.futures import Executor
 from http import HTTPStatus
-from typing import Union, List, Dict
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Union,
+    List,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response, StreamingResponse
+
+from layaberr import serializers, metrics, compression, formats
+from layaberr.core import (
+    DictErrors,
+    EncodedErrors,
+    ListErrors,
+    MessageCatalog,
+    RetainedReceivedData,
+    ValidationErrors,
+    iter_response_errors,
+)
 
 
 class Unauthorized(HTTPException):
@@ -28,32 +56,66 @@ class Forbidden(HTTPException):
         )
 
 
+class _EncodedResponse(Response):
+    def render(self, content: Union[bytes, bytearray, memoryview]) -> bytes:
+        # Body is already encoded, ASGI servers only send bytes
+        return content if isinstance(content, bytes) else bytes(content)
+
+
+def _response(
+    body: Union[bytes, bytearray, memoryview],
+    exc: Exception,
+    status_code: int,
+    start: float,
+    headers: Dict[str, str] = None,
+    media_type: str = formats.JSON,
+) -> Response:
+    if metrics.sinks:
+        metrics.observe(exc, status_code, perf_counter() - start, len(body))
+    return _EncodedResponse(
+        body, status_code=status_code, headers=headers, media_type=media_type
+    )
+
+
+def _dumps_detail(exc: HTTPException) -> bytes:
+    # Only default details (such as the ones of Unauthorized and Forbidden) are cached, others can be any text
+    try:
+        http_status = HTTPStatus(exc.status_code)
+    except ValueError:
+        return serializers.dumps(exc.detail)
+    if exc.detail == http_status.description or exc.detail == http_status.phrase:
+        return serializers.dumps_cached(exc.__class__, exc.detail, exc.status_code)
+    return serializers.dumps(exc.detail)
+
+
 async def http_exception(request: Request, exc: HTTPException):
     """
     type: string
     """
-    return JSONResponse(exc.detail, status_code=exc.status_code)
+    start = perf_counter()
+    body = _dumps_detail(exc)
+    return _response(body, exc, exc.status_code, start)
 
 
 async def exception(request: Request, exc: Exception):
     """
     type: string
     """
-    return JSONResponse(str(exc), status_code=500)
+    start = perf_counter()
+    return _response(serializers.dumps(str(exc)), exc, 500, start)
 
 
-DictErrors = Dict[str, List[str]]
-ListErrors = Dict[int, DictErrors]
-
-
-class ValidationFailed(HTTPException):
+class ValidationFailed(RetainedReceivedData, HTTPException):
     """Validation failed."""
 
     def __init__(
         self,
         received_data: Union[List, Dict],
-        errors: Union[ListErrors, DictErrors] = None,
+        errors: Union[
+            ListErrors, DictErrors, ValidationErrors, EncodedErrors, bytes, memoryview
+        ] = None,
         message: str = "",
+        retention: str = None,
     ):
         """
         Represent a client data validation error.
@@ -66,64 +128,478 @@ class ValidationFailed(HTTPException):
         If received_data is a dict:
             key is supposed to be the field name in error
             value is supposed to be a list of error messages on this field
+            Can also be a layaberr.core.ValidationErrors instance.
+        Can also be already encoded errors, sent as is: a layaberr.core.EncodedErrors instance or JSON bytes.
         :param message: The error message in case errors cannot be provided.
+        :param retention: How much of received data is kept, see layaberr.core.Retention.
+        default_retention (Retention.keep unless changed) by default.
         """
         HTTPException.__init__(self, status_code=HTTPStatus.BAD_REQUEST.value)
-        self.received_data = received_data
-        self.errors = errors if errors else {"": [message]}
+        self._set_errors(received_data, errors, message, retention)
 
 
-async def validation_failed_exception(request: Request, exc: ValidationFailed):
-    """
-    type: array
-    items:
-        required:
-            - field_name
-            - item
-        properties:
-            item:
+_error_item_schema = """
+required:
+    - field_name
+    - item
+properties:
+    item:
+        type: integer
+        description: Position of the item that could not be validated.
+        example: 1
+    field_name:
+        type: string
+        description: Name of the field that could not be validated.
+        example: sample_field_name
+    messages:
+        type: array
+        items:
+            type: string
+            description: Reason why the validation failed.
+            example: This is the reason why this field was not validated.
+type: object
+"""
+
+_received_schema = """
+received:
+    description: Received value of the field (truncated if too large).
+"""
+
+_summary_schema = """
+summary:
+    type: object
+    properties:
+        total:
+            type: integer
+            description: Total number of errors.
+            example: 1
+        fields:
+            type: object
+            description: Number of errors per field name.
+            additionalProperties:
                 type: integer
-                description: Position of the item that could not be validated.
-                example: 1
-            field_name:
-                type: string
-                description: Name of the field that could not be validated.
-                example: sample_field_name
-            messages:
-                type: array
-                items:
-                    type: string
-                    description: Reason why the validation failed.
-                    example: This is the reason why this field was not validated.
-        type: object
-    """
-    error_list = []
-    for field_name_or_index, messages_or_fields in exc.errors.items():
-        if isinstance(messages_or_fields, dict):
-            error_list.extend(
-                [
-                    {
-                        "item": field_name_or_index + 1,
-                        "field_name": field_name,
-                        "messages": messages,
-                    }
-                    for field_name, messages in messages_or_fields.items()
-                ]
+"""
+
+_codes_schema = """
+codes:
+    type: object
+    description: Message per code reported in errors messages.
+    additionalProperties:
+        type: string
+"""
+
+
+_formats_description = f"""description: Sent as {', '.join(formats.available)} according to Accept request header.
+    {formats.NDJSON} contains one error per line, followed by a line with everything sent alongside errors (if any).
+"""
+
+
+def _errors_schema(summarized: bool, codes: bool, echoed: bool = False) -> str:
+    """
+    :return: OpenAPI schema of the response, as YAML.
+    """
+    error_item_schema = _error_item_schema
+    if echoed:
+        error_item_schema = error_item_schema.replace(
+            "\ntype: object\n",
+            textwrap.indent(_received_schema, "    ") + "type: object\n",
+        )
+    errors_schema = "type: array\nitems:" + textwrap.indent(error_item_schema, "    ")
+    if not summarized and not codes:
+        return "\n" + errors_schema + _formats_description
+    schema = "\ntype: object\nproperties:\n    errors:\n" + textwrap.indent(
+        errors_schema, "        "
+    )
+    if summarized:
+        schema += textwrap.indent(_summary_schema.lstrip("\n"), "    ")
+    if codes:
+        schema += textwrap.indent(_codes_schema.lstrip("\n"), "    ")
+    return schema + _formats_description
+
+
+def _iter_json_array(items: Iterable, chunk_size: int) -> Iterator[bytes]:
+    """
+    Encode items as a JSON array, yielding one chunk of bytes every chunk_size items.
+    """
+    dumps = serializers.dumps
+    yield b"["
+    separator = b""
+    chunk = []
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) == chunk_size:
+            yield separator + b",".join(chunk)
+            separator = b","
+            chunk = []
+    if chunk:
+        yield separator + b",".join(chunk)
+    yield b"]"
+
+
+def _iter_json_object(
+    error_items: Iterable[dict], extra: dict, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Encode errors and what must be sent alongside (computed while errors are encoded) as a JSON object.
+    """
+    yield b'{"errors":'
+    yield from _iter_json_array(error_items, chunk_size)
+    for key, value in extra.items():
+        yield b',"' + key.encode() + b'":' + serializers.dumps(value)
+    yield b"}"
+
+
+def _iter_rendered(*render_args) -> Iterator[bytes]:
+    """
+    Encode the whole body once iterated (MessagePack arrays being prefixed by their length).
+    """
+    yield formats.render(*render_args)
+
+
+# Number of errors encoded per chunk of a streamed response
+streaming_chunk_size = 1000
+
+
+def _render_errors(
+    errors: Union[ListErrors, DictErrors, ValidationErrors],
+    media_type: str,
+    max_items: Optional[int],
+    max_messages: Optional[int],
+    catalog: Optional[MessageCatalog],
+    codes: bool,
+    dumps: serializers.Serializer,
+    coding: Optional[str] = None,
+    compression_threshold: Optional[int] = None,
+    received_data: Any = None,
+    echo_length: Optional[int] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    :return: Body and its content coding (None if not compressed).
+    """
+    body = formats.render(
+        errors,
+        media_type,
+        max_items,
+        max_messages,
+        catalog,
+        codes,
+        dumps,
+        received_data,
+        echo_length,
+    )
+    return _compress(body, coding, compression_threshold)
+
+
+def _compress(
+    body: Union[bytes, bytearray, memoryview],
+    coding: Optional[str],
+    compression_threshold: Optional[int],
+) -> Tuple[Union[bytes, bytearray, memoryview], Optional[str]]:
+    """
+    :return: Body and its content coding (None if not compressed).
+    """
+    if coding is not None and len(body) >= compression_threshold:
+        return compression.compress(body, coding), coding
+    return body, None
+
+
+def validation_failed_handler(
+    max_items: int = None,
+    max_messages: int = None,
+    streaming: bool = False,
+    offload_threshold: int = None,
+    executor: Executor = None,
+    catalog: MessageCatalog = None,
+    codes: bool = False,
+    compression_threshold: int = None,
+    echo_length: int = None,
+):
+    """
+    Create a handler for the layaberr.starlette.ValidationFailed exception.
+
+    :param max_items: Maximum number of errors sent to the client. All errors are sent by default.
+    :param max_messages: Maximum number of messages sent per error. All messages are sent by default.
+    If max_items or max_messages is provided, errors will be sent alongside a summary
+    (total number of errors and number of errors per field name).
+    :param streaming: Encode errors lazily and send them in chunks (of streaming_chunk_size errors).
+    Keeping memory usage bounded whatever the number of errors.
+    :param offload_threshold: Minimum number of errors (keys of ValidationFailed.errors or reported errors
+    if errors is a layaberr.core.ValidationErrors instance) for the body to be built by the executor instead of the event loop.
+    Body is always built by the event loop by default. Not used when streaming (as errors are then encoded in a thread pool).
+    :param executor: The concurrent.futures.Executor building bodies above offload_threshold.
+    Default event loop executor (a thread pool) is used by default.
+    A process pool can be provided for very large number of errors. In such a case,
+    errors and serializer must be picklable.
+    :param catalog: Message per code, if codes were reported instead of messages (see layaberr.core.MessageCatalog).
+    :param codes: Send codes (instead of messages) and the message of every reported code (as "codes").
+    Requires a catalog. Messages are sent instead of codes by default.
+    :param compression_threshold: Minimum size of the body (in bytes) for it to be compressed
+    (using the preferred content coding of the client, as in Accept-Encoding request header, see layaberr.compression).
+    Streamed bodies are always compressed if this is provided. Bodies are not compressed by default.
+    :param echo_length: Send the received value of every failing field (as "received"), looked up in
+    ValidationFailed.received_data. Values represented in more than echo_length characters are truncated.
+    Received values are not sent by default. Already encoded errors are sent without received values.
+    :return: The handler, documented for layab.
+    """
+    if codes and catalog is None:
+        raise ValueError("A message catalog is required to send codes.")
+
+    summarized = max_items is not None or max_messages is not None
+
+    async def handle_exception(request: Request, exc: ValidationFailed):
+        start = perf_counter()
+        coding = None
+        if compression_threshold is not None:
+            coding = compression.negotiate(request.headers.get("accept-encoding", ""))
+
+        accept = request.headers.get("accept", "")
+        errors = exc.errors
+        if isinstance(errors, EncodedErrors):
+            if formats.accepts(accept, errors.media_type):
+                body, coding = _compress(errors.body, coding, compression_threshold)
+                headers = (
+                    compression.headers(coding)
+                    if compression_threshold is not None
+                    else None
+                )
+                return _response(
+                    body, exc, exc.status_code, start, headers, errors.media_type
+                )
+            # Errors are only decoded if the client requires another media type
+            errors = errors.decode()
+
+        media_type = formats.negotiate(accept)
+        # Received data is only required to echo received values (and is sent to the executor)
+        received_data = exc.received_data if echo_length is not None else None
+
+        if streaming:
+            if media_type == formats.MSGPACK:
+                content = _iter_rendered(
+                    errors,
+                    media_type,
+                    max_items,
+                    max_messages,
+                    catalog,
+                    codes,
+                    None,
+                    received_data,
+                    echo_length,
+                )
+            else:
+                extra = {}
+                error_items = iter_response_errors(
+                    errors,
+                    extra,
+                    max_items,
+                    max_messages,
+                    catalog,
+                    codes,
+                    received_data,
+                    echo_length,
+                )
+                if media_type == formats.NDJSON:
+                    content = formats.iter_ndjson(
+                        error_items, extra, streaming_chunk_size
+                    )
+                elif extra:
+                    content = _iter_json_object(
+                        error_items, extra, streaming_chunk_size
+                    )
+                else:
+                    content = _iter_json_array(error_items, streaming_chunk_size)
+            if coding is not None:
+                content = compression.iter_compressed(content, coding)
+            if metrics.sinks:
+                content = metrics.measure_chunks(content, exc, exc.status_code, start)
+            # A synchronous iterator is consumed in a thread pool by Starlette, leaving the event loop free
+            return StreamingResponse(
+                content,
+                status_code=exc.status_code,
+                headers=(
+                    compression.headers(coding)
+                    if compression_threshold is not None
+                    else None
+                ),
+                media_type=media_type,
+            )
+
+        if offload_threshold is not None and len(errors) >= offload_threshold:
+            # Body is also compressed by the executor
+            body, coding = await asyncio.get_event_loop().run_in_executor(
+                executor,
+                _render_errors,
+                errors,
+                media_type,
+                max_items,
+                max_messages,
+                catalog,
+                codes,
+                serializers.current(),
+                coding,
+                compression_threshold,
+                received_data,
+                echo_length,
             )
         else:
-            error_list.append(
-                {
-                    "item": 1,
-                    "field_name": field_name_or_index,
-                    "messages": messages_or_fields,
-                }
+            body, coding = _render_errors(
+                errors,
+                media_type,
+                max_items,
+                max_messages,
+                catalog,
+                codes,
+                serializers.current(),
+                coding,
+                compression_threshold,
+                received_data,
+                echo_length,
             )
-    return JSONResponse(error_list, status_code=exc.status_code)
+        headers = (
+            compression.headers(coding) if compression_threshold is not None else None
+        )
+        return _response(body, exc, exc.status_code, start, headers, media_type)
+
+    handle_exception.__doc__ = _errors_schema(
+        summarized, codes, echo_length is not None
+    )
+    return handle_exception
+
+
+validation_failed_exception = validation_failed_handler()
+streaming_validation_failed_exception = validation_failed_handler(streaming=True)
+
+
+Handler = Callable[[Request, Exception], Awaitable[Response]]
+
+
+def error_handler(http_status: HTTPStatus) -> Handler:
+    """
+    Create a handler sending the exception message (or detail for HTTPException) with the provided status.
+
+    :param http_status: The http.HTTPStatus of the response.
+    :return: The handler, documented for layab.
+    """
+
+    async def handle_exception(request: Request, exc: Exception):
+        start = perf_counter()
+        if isinstance(exc, HTTPException):
+            body = _dumps_detail(exc)
+        else:
+            body = serializers.dumps(str(exc))
+        return _response(body, exc, http_status.value, start)
+
+    handle_exception.__doc__ = http_exception.__doc__
+    return handle_exception
+
+
+class ExceptionHandlers(MutableMapping):
+    """
+    Exception handlers per exception class, to be provided as Starlette exception_handlers.
+
+    The handler of an exception class (the one registered for the closest class in its MRO)
+    is only looked up once per concrete exception class, see resolve.
+    """
+
+    def __init__(self, handlers: Mapping[type, Handler] = None):
+        """
+        :param handlers: Handler per exception class.
+        """
+        self._handlers: Dict[type, Handler] = dict(handlers) if handlers else {}
+        # Handler (None if there is none) per concrete exception class
+        self._resolved: Dict[type, Optional[Handler]] = {}
+
+    def add(
+        self,
+        exception_class: type,
+        http_status: HTTPStatus = None,
+        handler: Handler = None,
+    ) -> "ExceptionHandlers":
+        """
+        Handle the provided exception class (and its subclasses without a handler of their own).
+
+        :param exception_class: The exception class to handle.
+        :param http_status: The http.HTTPStatus of the response, if handler is not provided.
+        Response will contain the exception message (or detail for HTTPException).
+        :param handler: The handler, if http_status is not provided.
+        :return: This instance, so that calls can be chained.
+        """
+        if handler is None:
+            if http_status is None:
+                raise ValueError("Either http_status or handler must be provided.")
+            handler = error_handler(http_status)
+        self[exception_class] = handler
+        return self
+
+    def resolve(self, exception_class: type) -> Optional[Handler]:
+        """
+        :return: The handler of this exception class, None if there is none.
+        """
+        try:
+            return self._resolved[exception_class]
+        except KeyError:
+            pass
+        handler = None
+        for cls in exception_class.__mro__:
+            handler = self._handlers.get(cls)
+            if handler is not None:
+                break
+        self._resolved[exception_class] = handler
+        return handler
+
+    def copy(self) -> "ExceptionHandlers":
+        return ExceptionHandlers(self._handlers)
+
+    def __getitem__(self, exception_class: type) -> Handler:
+        return self._handlers[exception_class]
+
+    def __setitem__(self, exception_class: type, handler: Handler) -> None:
+        self._handlers[exception_class] = handler
+        self._resolved.clear()
+
+    def __delitem__(self, exception_class: type) -> None:
+        del self._handlers[exception_class]
+        self._resolved.clear()
 
+    def __iter__(self) -> Iterator[type]:
+        return iter(self._handlers)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._handlers!r})"
+
+
+# Use exception_handlers.copy().add(...) to handle other exceptions
+exception_handlers = ExceptionHandlers(
+    {
+        ValidationFailed: validation_failed_exception,
+        Unauthorized: http_exception,
+        Forbidden: http_exception,
+        Exception: exception,
+    }
+)
+
+
+def aggregation_endpoint(aggregation: "layaberr.fingerprints.Aggregation"):
+    """
+    Create an endpoint sending the most frequent errors (as layaberr.fingerprints.Aggregation.top).
+    Number of fingerprints, fields and codes can be provided as "top" query parameter (10 by default).
+
+    :param aggregation: The aggregation, added as a metrics sink (see layaberr.metrics.add_sink).
+    """
+
+    async def endpoint(request: Request) -> Response:
+        try:
+            count = int(request.query_params.get("top", 10))
+        except ValueError:
+            return Response(
+                serializers.dumps("top must be an integer."),
+                status_code=HTTPStatus.BAD_REQUEST.value,
+                media_type=formats.JSON,
+            )
+        return Response(
+            serializers.dumps(aggregation.top(count)), media_type=formats.JSON
+        )
 
-exception_handlers = {
-    ValidationFailed: validation_failed_exception,
-    Unauthorized: http_exception,
-    Forbidden: http_exception,
-    Exception: exception,
-}
+    return endpoint
@@ -44,9 +44,24 @@ setup(
             # Used to manage testing of a Starlette application
             "starlette==0.13.*",
             "requests==2.*",
+            # Used to check Brotli content coding
+            "brotli==1.*",
+            # Used to check MessagePack format
+            "msgpack==1.*",
             # Used to check coverage
             "pytest-cov==2.*",
-        ]
+        ],
+        "benchmarking": [
+            # Used to measure performances of error handling
+            "pytest-benchmark==3.*",
+        ],
+        # Faster JSON serializers, see layaberr.serializers
+        "orjson": ["orjson==3.*"],
+        "msgspec": ["msgspec==0.*"],
+        # Brotli content coding, see layaberr.compression
+        "brotli": ["brotli==1.*"],
+        # MessagePack format, see layaberr.formats
+        "msgpack": ["msgpack==1.*"],
     },
     python_requires=">=3.6",
     project_urls={
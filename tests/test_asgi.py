@@ -0,0 +1,195 @@
+from http import HTTPStatus
+
+import pytest
+from starlette.exceptions import HTTPException
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Router, Route, WebSocketRoute
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr import metrics
+from layaberr.asgi import ErrorMiddleware
+
+
+class NotFound(Exception):
+    pass
+
+
+def validation_failed(request):
+    raise layaberr.starlette.ValidationFailed(
+        {"key 1": "value 1"}, errors={"key 1": ["an error"]}
+    )
+
+
+def unauthorized(request):
+    raise layaberr.starlette.Unauthorized()
+
+
+def forbidden(request):
+    raise layaberr.starlette.Forbidden("Forbidden message")
+
+
+def http_exception(request):
+    raise HTTPException(404, "Not found")
+
+
+def not_found(request):
+    raise NotFound("Item cannot be found")
+
+
+def default_error(request):
+    raise Exception("Error message")
+
+
+def started_response(request):
+    def content():
+        yield b"start"
+        raise Exception("Error message")
+
+    return StreamingResponse(content())
+
+
+def success(request):
+    return Response(b"ok")
+
+
+async def websocket(session):
+    await session.accept()
+    await session.send_text("ok")
+    await session.close()
+
+
+router = Router(
+    [
+        Route("/validation_failed", validation_failed),
+        Route("/unauthorized", unauthorized),
+        Route("/forbidden", forbidden),
+        Route("/http_exception", http_exception),
+        Route("/not_found", not_found),
+        Route("/default_error", default_error),
+        Route("/started_response", started_response),
+        Route("/success", success),
+        WebSocketRoute("/websocket", websocket),
+    ]
+)
+
+
+@pytest.fixture
+def client():
+    exception_handlers = layaberr.starlette.exception_handlers.copy().add(
+        NotFound, HTTPStatus.NOT_FOUND
+    )
+    return TestClient(
+        ErrorMiddleware(router, exception_handlers), raise_server_exceptions=False
+    )
+
+
+def test_validation_failed(client):
+    response = client.get("/validation_failed")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": 1, "field_name": "key 1", "messages": ["an error"]}
+    ]
+
+
+def test_unauthorized(client):
+    response = client.get("/unauthorized")
+    assert response.status_code == 401
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json() == "No permission -- see authorization schemes"
+
+
+def test_forbidden(client):
+    response = client.get("/forbidden")
+    assert response.status_code == 403
+    assert response.json() == "Forbidden message"
+
+
+def test_http_exception(client):
+    response = client.get("/http_exception")
+    assert response.status_code == 404
+    assert response.json() == "Not found"
+
+
+def test_custom_exception(client):
+    response = client.get("/not_found")
+    assert response.status_code == 404
+    assert response.json() == "Item cannot be found"
+
+
+def test_default_error(client):
+    response = client.get("/default_error")
+    assert response.status_code == 500
+    assert response.headers["Content-Length"] == str(len(b'"Error message"'))
+    assert response.json() == "Error message"
+
+
+def test_empty_exception_handlers():
+    middleware = ErrorMiddleware(router, layaberr.starlette.ExceptionHandlers())
+    assert dict(middleware.exception_handlers) == {
+        HTTPException: layaberr.starlette.http_exception
+    }
+
+
+def test_dict_exception_handlers():
+    client = TestClient(
+        ErrorMiddleware(
+            router,
+            {
+                **layaberr.starlette.exception_handlers,
+                NotFound: layaberr.starlette.error_handler(HTTPStatus.NOT_FOUND),
+            },
+        ),
+        raise_server_exceptions=False,
+    )
+    response = client.get("/unauthorized")
+    assert response.status_code == 401
+    assert response.json() == "No permission -- see authorization schemes"
+    response = client.get("/not_found")
+    assert response.status_code == 404
+    assert response.json() == "Item cannot be found"
+
+
+def test_default_error_raised_again():
+    client = TestClient(ErrorMiddleware(router))
+    with pytest.raises(Exception) as exception_info:
+        client.get("/default_error")
+    assert str(exception_info.value) == "Error message"
+
+
+def test_error_after_response_started():
+    client = TestClient(ErrorMiddleware(router))
+    with pytest.raises(Exception) as exception_info:
+        client.get("/started_response")
+    assert str(exception_info.value) == "Error message"
+
+
+def test_success(client):
+    response = client.get("/success")
+    assert response.status_code == 200
+    assert response.content == b"ok"
+
+
+def test_websocket(client):
+    with client.websocket_connect("/websocket") as session:
+        assert session.receive_text() == "ok"
+
+
+def test_without_handler():
+    client = TestClient(
+        ErrorMiddleware(router, layaberr.starlette.ExceptionHandlers()),
+        raise_server_exceptions=False,
+    )
+    response = client.get("/not_found")
+    assert response.status_code == 500
+    assert response.json() == "Item cannot be found"
+
+
+def test_metrics(client):
+    sink = metrics.add_sink(metrics.InMemorySink())
+    try:
+        client.get("/unauthorized")
+        client.get("/default_error")
+    finally:
+        metrics.remove_sink(sink)
+    assert sink.counts == {("Unauthorized", 401): 1, ("Exception", 500): 1}
@@ -0,0 +1,53 @@
+import gzip
+
+import brotli
+
+from layaberr import compression
+
+
+def test_negotiate_preferred_coding():
+    assert compression.negotiate("gzip, deflate, br") == "br"
+
+
+def test_negotiate_quality():
+    assert compression.negotiate("br;q=0.5, gzip") == "gzip"
+
+
+def test_negotiate_refused_coding():
+    assert compression.negotiate("br;q=0, gzip;q=0") is None
+
+
+def test_negotiate_invalid_quality():
+    assert compression.negotiate("br;q=invalid, gzip") == "gzip"
+
+
+def test_negotiate_wildcard():
+    assert compression.negotiate("*") == "br"
+
+
+def test_negotiate_identity():
+    assert compression.negotiate("") is None
+    assert compression.negotiate("identity") is None
+
+
+def test_compress():
+    assert gzip.decompress(compression.compress(b"body", "gzip")) == b"body"
+    assert brotli.decompress(compression.compress(b"body", "br")) == b"body"
+
+
+def test_iter_compressed():
+    chunks = [b"[", b'"error"' * 1000, b"]"]
+    assert gzip.decompress(b"".join(compression.iter_compressed(chunks, "gzip"))) == (
+        b"".join(chunks)
+    )
+    assert brotli.decompress(b"".join(compression.iter_compressed(chunks, "br"))) == (
+        b"".join(chunks)
+    )
+
+
+def test_headers():
+    assert compression.headers("gzip") == {
+        "Content-Encoding": "gzip",
+        "Vary": "Accept-Encoding",
+    }
+    assert compression.headers(None) == {"Vary": "Accept-Encoding"}
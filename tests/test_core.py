@@ -0,0 +1,600 @@
+import hashlib
+import json
+import tracemalloc
+
+import msgpack
+import pytest
+
+from layaberr.core import (
+    Retention,
+    RetainedReceivedData,
+    offending_items,
+    echo,
+    iter_echoed,
+    EncodedErrors,
+    ErrorCollector,
+    ValidationErrors,
+    iter_errors,
+    to_list,
+    iter_summarized,
+    summarize,
+    preview,
+    digest,
+    MessageCatalog,
+    response_content,
+)
+
+
+def test_validation_errors_grouped_per_item_and_field():
+    errors = ValidationErrors()
+    errors.add("a field", "an error 1.")
+    errors.add("a field", "an error 2.", item=1)
+    errors.add("another_field", "first error 2", item=1)
+    errors.add("a field", "an error 3.")
+    errors.add("another_field", "second error 2", item=1)
+    assert errors.to_list() == [
+        {
+            "item": 1,
+            "field_name": "a field",
+            "messages": ["an error 1.", "an error 3."],
+        },
+        {"item": 2, "field_name": "a field", "messages": ["an error 2."]},
+        {
+            "item": 2,
+            "field_name": "another_field",
+            "messages": ["first error 2", "second error 2"],
+        },
+    ]
+
+
+def test_validation_errors_reported_in_order():
+    errors = ValidationErrors()
+    errors.add("a field", "an error 1.")
+    errors.add("a field", "an error 2.")
+    errors.add("another_field", "an error 3.")
+    errors.add("another_field", "an error 4.", item=1)
+    errors.add("a field", "an error 5.", item=1)
+    assert errors.to_list() == [
+        {
+            "item": 1,
+            "field_name": "a field",
+            "messages": ["an error 1.", "an error 2."],
+        },
+        {"item": 1, "field_name": "another_field", "messages": ["an error 3."]},
+        {"item": 2, "field_name": "another_field", "messages": ["an error 4."]},
+        {"item": 2, "field_name": "a field", "messages": ["an error 5."]},
+    ]
+
+
+def test_validation_errors_field_reported_again_for_the_same_item():
+    errors = ValidationErrors()
+    errors.add("a field", "an error 1.", item=1)
+    errors.add("another_field", "an error 2.", item=1)
+    errors.add("a field", "an error 3.", item=1)
+    assert errors.to_list() == [
+        {
+            "item": 2,
+            "field_name": "a field",
+            "messages": ["an error 1.", "an error 3."],
+        },
+        {"item": 2, "field_name": "another_field", "messages": ["an error 2."]},
+    ]
+
+
+def test_validation_errors_first_item_memory_is_bounded():
+    errors = ValidationErrors()
+    for item in range(200_000):
+        errors.add("a field", "an error", item=item)
+        errors.add("another field", "an error", item=item)
+
+    tracemalloc.start()
+    try:
+        error_items = iter_errors(errors)
+        assert next(error_items) == {
+            "item": 1,
+            "field_name": "a field",
+            "messages": ["an error"],
+        }
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 100_000
+
+
+def test_validation_errors_iteration():
+    errors = ValidationErrors()
+    errors.add("a field", "an error")
+    errors.add("a field", "an error", item=3)
+    assert list(errors) == [(0, "a field", "an error"), (3, "a field", "an error")]
+    assert len(errors) == 2
+
+
+def test_validation_errors_store_strings_once():
+    errors = ValidationErrors()
+    for item in range(100):
+        errors.add("a field", "an error", item=item)
+    assert errors._field_names == ["a field"]
+    assert errors._messages == ["an error"]
+
+
+def test_empty_validation_errors():
+    errors = ValidationErrors()
+    assert not errors
+    assert errors.to_list() == []
+    assert repr(errors) == "ValidationErrors(0 errors)"
+
+
+def error_items(size: int):
+    for index in range(size):
+        yield {
+            "item": index + 1,
+            "field_name": "a field" if index % 2 else "another_field",
+            "messages": ["first error", "second error"],
+        }
+
+
+def test_summarize_without_limits():
+    assert summarize(error_items(2)) == {
+        "errors": [
+            {
+                "item": 1,
+                "field_name": "another_field",
+                "messages": ["first error", "second error"],
+            },
+            {
+                "item": 2,
+                "field_name": "a field",
+                "messages": ["first error", "second error"],
+            },
+        ],
+        "summary": {"total": 2, "fields": {"another_field": 1, "a field": 1}},
+    }
+
+
+def test_summarize_with_limits():
+    assert summarize(error_items(5), max_items=1, max_messages=1) == {
+        "errors": [
+            {"item": 1, "field_name": "another_field", "messages": ["first error"]}
+        ],
+        "summary": {"total": 5, "fields": {"another_field": 3, "a field": 2}},
+    }
+
+
+def test_summarize_no_errors():
+    assert summarize(error_items(0), max_items=1) == {
+        "errors": [],
+        "summary": {"total": 0, "fields": {}},
+    }
+
+
+def test_iter_summarized_is_lazy():
+    summary = {}
+    items = iter_summarized(error_items(3), summary, max_items=2)
+    assert next(items)["item"] == 1
+    assert summary == {}
+    assert [item["item"] for item in items] == [2]
+    assert summary == {"total": 3, "fields": {"another_field": 2, "a field": 1}}
+
+
+def test_preview_of_small_data():
+    assert preview({"field": [1, "value"]}, 100) == "{'field': [1, 'value']}"
+
+
+def test_preview_only_represents_first_elements():
+    assert (
+        preview(list(range(1_000_000)), 1000) == repr(list(range(20)))[:-1] + ", ...]"
+    )
+
+
+def test_preview_is_bounded():
+    assert preview("a" * 50, 10) == "'aaaaaa..."
+
+
+def test_digest():
+    assert digest([{"field": "value"}]) == digest([{"field": "value"}])
+    assert digest([{"field": "value"}]) != digest([{"field": "other value"}])
+
+
+def test_to_list_dict_errors():
+    assert to_list({"a field": ["an error"], "another_field": ["first", "second"]}) == [
+        {"item": 1, "field_name": "a field", "messages": ["an error"]},
+        {"item": 1, "field_name": "another_field", "messages": ["first", "second"]},
+    ]
+
+
+def test_to_list_list_errors():
+    assert to_list(
+        {0: {"a field": ["an error 1."]}, 3: {"a field": ["an error 2."]}}
+    ) == [
+        {"item": 1, "field_name": "a field", "messages": ["an error 1."]},
+        {"item": 4, "field_name": "a field", "messages": ["an error 2."]},
+    ]
+
+
+def test_to_list_validation_errors():
+    errors = ValidationErrors()
+    errors.add("a field", "an error", item=2)
+    assert to_list(errors) == [
+        {"item": 3, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_iter_errors_is_lazy():
+    errors = iter_errors({index: {"a field": ["an error"]} for index in range(10)})
+    assert next(errors) == {
+        "item": 1,
+        "field_name": "a field",
+        "messages": ["an error"],
+    }
+
+
+def test_iter_errors_validation_errors():
+    errors = ValidationErrors()
+    errors.add("a field", "an error")
+    assert list(iter_errors(errors)) == [
+        {"item": 1, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_message_catalog_register():
+    catalog = MessageCatalog({"required": "Missing data for required field."})
+    assert catalog.register("invalid", "Not a valid integer.") == "invalid"
+    assert catalog.messages == {
+        "required": "Missing data for required field.",
+        "invalid": "Not a valid integer.",
+    }
+
+
+def test_response_content_inline_messages():
+    catalog = MessageCatalog({"required": "Missing data for required field."})
+    errors = ValidationErrors()
+    errors.add("a field", "required", item=0)
+    errors.add("a field", "not a code", item=1)
+    assert response_content(errors, catalog=catalog) == [
+        {
+            "item": 1,
+            "field_name": "a field",
+            "messages": ["Missing data for required field."],
+        },
+        {"item": 2, "field_name": "a field", "messages": ["not a code"]},
+    ]
+
+
+def test_response_content_codes():
+    catalog = MessageCatalog({"required": "Missing data for required field."})
+    catalog.register("unused", "Not reported.")
+    errors = {index: {"a field": ["required", "not a code"]} for index in range(3)}
+    assert response_content(errors, catalog=catalog, codes=True) == {
+        "errors": [
+            {
+                "item": 1,
+                "field_name": "a field",
+                "messages": ["required", "not a code"],
+            },
+            {
+                "item": 2,
+                "field_name": "a field",
+                "messages": ["required", "not a code"],
+            },
+            {
+                "item": 3,
+                "field_name": "a field",
+                "messages": ["required", "not a code"],
+            },
+        ],
+        "codes": {"required": "Missing data for required field."},
+    }
+
+
+def test_response_content_summarized_codes():
+    catalog = MessageCatalog({"required": "Missing data for required field."})
+    errors = {index: {"a field": ["required"]} for index in range(3)}
+    assert response_content(errors, max_items=1, catalog=catalog, codes=True) == {
+        "errors": [{"item": 1, "field_name": "a field", "messages": ["required"]}],
+        "summary": {"total": 3, "fields": {"a field": 3}},
+        "codes": {"required": "Missing data for required field."},
+    }
+
+
+class ValidationFailed(Exception):
+    def __init__(self, received_data, errors, message=""):
+        self.received_data = received_data
+        self.errors = errors
+        self.message = message
+
+
+def test_error_collector_raises_on_exit():
+    with pytest.raises(ValidationFailed) as exception_info:
+        with ErrorCollector([{}, {}], ValidationFailed, message="a message") as errors:
+            errors.add("a field", "an error", item=0)
+            errors.add("a field", "an error", item=1)
+    assert exception_info.value.received_data == [{}, {}]
+    assert exception_info.value.message == "a message"
+    assert to_list(exception_info.value.errors) == [
+        {"item": 1, "field_name": "a field", "messages": ["an error"]},
+        {"item": 2, "field_name": "a field", "messages": ["an error"]},
+    ]
+    # Reaching the end of the context is not the reason why exception was raised
+    assert exception_info.value.__context__ is None
+
+
+def test_error_collector_without_errors():
+    with ErrorCollector({}, ValidationFailed) as errors:
+        pass
+    assert len(errors.errors) == 0
+
+
+def test_error_collector_max_errors():
+    validated = []
+    with pytest.raises(ValidationFailed) as exception_info:
+        with ErrorCollector([], ValidationFailed, max_errors=2) as errors:
+            for index in range(1_000_000):
+                validated.append(index)
+                errors.add("a field", "an error", item=index)
+    assert validated == [0, 1]
+    assert len(exception_info.value.errors) == 2
+    assert exception_info.value.__suppress_context__
+
+
+def test_error_collector_max_errors_not_caught_by_validators():
+    validated = []
+    with pytest.raises(ValidationFailed) as exception_info:
+        with ErrorCollector([], ValidationFailed, max_errors=2) as errors:
+            for index in range(10):
+                try:
+                    validated.append(index)
+                    errors.add("a field", "an error", item=index)
+                except Exception:
+                    pass
+    assert validated == [0, 1]
+    assert len(exception_info.value.errors) == 2
+
+
+def test_error_collector_max_errors_when_stop_is_caught():
+    with pytest.raises(ValidationFailed) as exception_info:
+        with ErrorCollector([], ValidationFailed, max_errors=2) as errors:
+            for index in range(10):
+                try:
+                    errors.add("a field", "an error", item=index)
+                except BaseException:
+                    pass
+    assert len(exception_info.value.errors) == 2
+
+
+def test_error_collector_fail_fast():
+    with pytest.raises(ValidationFailed) as exception_info:
+        with ErrorCollector([], ValidationFailed, fail_fast=True) as errors:
+            errors.add("a field", "an error")
+            errors.add("a field", "another error")
+    assert len(exception_info.value.errors) == 1
+
+
+def test_error_collector_other_exceptions_are_propagated():
+    with pytest.raises(ZeroDivisionError):
+        with ErrorCollector([], ValidationFailed) as errors:
+            errors.add("a field", "an error")
+            1 / 0
+
+
+def test_encoded_errors_memoryview_is_not_copied():
+    body = bytearray(b'[{"item":1,"field_name":"a field","messages":["an error"]}]')
+    errors = EncodedErrors(memoryview(body))
+    assert errors.body.obj is body
+    assert len(errors.body) == len(body)
+    assert repr(errors) == "EncodedErrors(59 bytes of application/json)"
+
+
+def test_encoded_errors_to_list():
+    errors = EncodedErrors(
+        b'[{"item":1,"field_name":"a field","messages":["an error","another error"]}]'
+    )
+    assert to_list(errors) == [
+        {"item": 1, "field_name": "a field", "messages": ["an error", "another error"]}
+    ]
+    assert list(iter_errors(errors)) == to_list(errors)
+
+
+def test_encoded_errors_decode_summarized():
+    errors = EncodedErrors(
+        b'{"errors":[{"item":2,"field_name":"a field","messages":["an error"]}],"summary":{"total":1}}'
+    )
+    assert to_list(errors) == [
+        {"item": 2, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_encoded_errors_decode_ndjson():
+    errors = EncodedErrors(
+        b'{"item":2,"field_name":"a field","messages":["an error"]}\n{"summary":{"total":1}}\n',
+        "application/x-ndjson",
+    )
+    assert to_list(errors) == [
+        {"item": 2, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_encoded_errors_decode_msgpack():
+    errors = EncodedErrors(
+        msgpack.packb([{"item": 2, "field_name": "a field", "messages": ["an error"]}]),
+        "application/msgpack",
+    )
+    assert to_list(errors) == [
+        {"item": 2, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_offending_items_of_list():
+    received_data = [{"key": index} for index in range(5)]
+    errors = {1: {"key": ["an error"]}, 3: {"key": ["an error"]}, 10: {}}
+    assert offending_items(received_data, errors) == {1: {"key": 1}, 3: {"key": 3}}
+
+
+def test_offending_fields_of_dict():
+    received_data = {"key 1": "value 1", "key 2": "value 2"}
+    errors = {"key 2": ["an error"], "": ["a message"]}
+    assert offending_items(received_data, errors) == {"key 2": "value 2"}
+
+
+def test_offending_items_validation_errors():
+    errors = ValidationErrors()
+    errors.add("key", "an error", item=2)
+    errors.add("other key", "an error", item=2)
+    assert offending_items(["a", "b", "c"], errors) == {2: "c"}
+    assert offending_items({"key": 1, "unrelated": 2}, errors) == {"key": 1}
+
+
+def test_offending_items_cannot_be_retrieved():
+    assert offending_items("data", {"key": ["an error"]}) is None
+    assert offending_items([1], EncodedErrors(b"[]")) is None
+
+
+class ReceivedData(RetainedReceivedData):
+    def __init__(self, received_data, errors, retention=None):
+        self._retain(received_data, errors, retention)
+
+
+def test_retention_keep():
+    received_data = [{"key": 1}]
+    retained = ReceivedData(received_data, {0: {"key": ["an error"]}})
+    assert retained.retention == "keep"
+    assert retained.received_data is received_data
+    assert retained.received_data_preview == "[{'key': 1}]"
+    assert retained.received_data_digest == digest(received_data)
+
+
+def test_retention_offending_items():
+    retained = ReceivedData(
+        [{"key": 1}, {"key": 2}], {1: {"key": ["an error"]}}, "offending_items"
+    )
+    assert retained.received_data == {1: {"key": 2}}
+    assert retained.received_data_digest == digest({1: {"key": 2}})
+
+
+def test_retention_preview():
+    received_data = [{"key": 1}]
+    retained = ReceivedData(received_data, {}, Retention.preview)
+    assert retained.received_data is None
+    assert retained.received_data_preview == "[{'key': 1}]"
+    assert retained.received_data_digest is None
+
+
+def test_retention_preview_with_digest(monkeypatch):
+    monkeypatch.setattr(ReceivedData, "preview_digest", True)
+    received_data = [{"key": 1}]
+    retained = ReceivedData(received_data, {}, Retention.preview)
+    assert retained.received_data is None
+    assert retained.received_data_digest == digest(received_data)
+
+
+def large_received_data():
+    return [{"key": f"value {index}", "other": [index] * 10} for index in range(10_000)]
+
+
+def test_retention_preview_is_cheap():
+    received_data = large_received_data()
+    tracemalloc.start()
+    try:
+        ReceivedData(received_data, {}, Retention.preview)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 100_000
+
+
+def test_digest_memory_is_bounded():
+    received_data = large_received_data()
+    # Whole JSON representation is about 1 MB
+    tracemalloc.start()
+    try:
+        digest(received_data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 300_000
+
+
+def test_digest_of_json_representation():
+    data = {"key": "valué", 1: [1.5, None, True], "other": object}
+    assert (
+        digest(data)
+        == hashlib.sha256(json.dumps(data, default=str).encode("utf-8")).hexdigest()
+    )
+
+
+def test_retention_drop():
+    retained = ReceivedData([{"key": 1}], {}, Retention.drop)
+    assert retained.received_data is None
+    assert retained.received_data_preview == ""
+    assert retained.received_data_digest is None
+
+
+def test_default_retention(monkeypatch):
+    monkeypatch.setattr(ReceivedData, "default_retention", Retention.drop)
+    assert ReceivedData([{"key": 1}], {}).received_data is None
+
+
+def test_unsupported_retention():
+    with pytest.raises(ValueError) as exception_info:
+        ReceivedData([], {}, "unknown")
+    assert (
+        str(exception_info.value)
+        == "unknown retention is not supported. Supported retentions are ['keep', 'offending_items', 'preview', 'drop']."
+    )
+
+
+def test_echo():
+    assert echo(None, 5) is None
+    assert echo(123456789, 5) == 123456789
+    assert echo("value", 5) == "value"
+    assert echo("values", 5) == "va..."
+    assert echo([1, 2], 6) == [1, 2]
+    assert echo([1, 2, 3], 6) == "[1,..."
+    assert echo(list(range(30)), 1000) == list(range(30))
+
+
+def test_echo_value_containing_ellipsis():
+    assert echo({"a": "wait..."}, 100) == {"a": "wait..."}
+
+
+def test_echo_truncated_as_json():
+    assert echo({"k": ["é", None, True]}, 100) == {"k": ["é", None, True]}
+    assert echo({"k": ["é", None, True]}, 16) == '{"k":["é",nul...'
+
+
+def test_echo_only_encodes_what_is_sent():
+    class NotEncoded:
+        def __str__(self):
+            raise AssertionError("Value should not be encoded")
+
+    assert echo([1, 2, 3, NotEncoded()], 6) == "[1,..."
+
+
+def test_iter_echoed_per_index():
+    error_items = [
+        {"item": 1, "field_name": "key", "messages": []},
+        {"item": 3, "field_name": "key", "messages": []},
+        {"item": 2, "field_name": "key", "messages": []},
+    ]
+    assert list(iter_echoed(error_items, [{"key": 1}, {"other": 2}], 10)) == [
+        {"item": 1, "field_name": "key", "messages": [], "received": 1},
+        {"item": 3, "field_name": "key", "messages": []},
+        {"item": 2, "field_name": "key", "messages": []},
+    ]
+
+
+def test_iter_echoed_without_received_data():
+    error_items = [{"item": 1, "field_name": "key", "messages": []}]
+    assert list(iter_echoed(error_items, None, 10)) == [
+        {"item": 1, "field_name": "key", "messages": []}
+    ]
+
+
+def test_iter_echoed_single_record():
+    error_items = [
+        {"item": 1, "field_name": "key", "messages": []},
+        {"item": 2, "field_name": "key", "messages": []},
+    ]
+    assert list(iter_echoed(error_items, {"key": "value"}, 10)) == [
+        {"item": 1, "field_name": "key", "messages": [], "received": "value"},
+        {"item": 2, "field_name": "key", "messages": []},
+    ]
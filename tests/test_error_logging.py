@@ -0,0 +1,129 @@
+import logging
+
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+from layaberr import error_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_error_logging")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    yield logger
+    logger.removeHandler(handler)
+    logger.filters.clear()
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(error_logging, "monotonic", lambda: now[0])
+    return now
+
+
+def raise_and_log(logger, exception_class=ValueError):
+    try:
+        raise exception_class("Error message")
+    except Exception:
+        logger.exception("Unexpected error")
+
+
+def test_first_occurrence_is_logged_then_counted(logger, now):
+    error_logging.deduplicate(logger, interval=10)
+    for _ in range(5):
+        raise_and_log(logger)
+    now[0] += 10
+    raise_and_log(logger)
+    records = logger.handlers[0].records
+    assert len(records) == 2
+    assert records[0].exc_info[0] is ValueError
+    assert records[0].getMessage() == "Unexpected error"
+    assert records[1].exc_info is None
+    assert (
+        records[1].getMessage()
+        == "Unexpected error (ValueError occurred 5 times since last logged)"
+    )
+
+
+def test_different_exceptions_are_logged(logger, now):
+    error_logging.deduplicate(logger)
+    raise_and_log(logger, ValueError)
+    raise_and_log(logger, KeyError)
+    raise_and_log(logger, ValueError)
+    assert [record.exc_info[0] for record in logger.handlers[0].records] == [
+        ValueError,
+        KeyError,
+    ]
+
+
+def test_records_without_exception_are_logged(logger):
+    error_logging.deduplicate(logger)
+    logger.error("An error")
+    logger.error("An error")
+    assert len(logger.handlers[0].records) == 2
+
+
+def test_least_recently_seen_exceptions_are_forgotten(logger, now):
+    exceptions_filter = error_logging.DeduplicateExceptions(max_fingerprints=1)
+    logger.addFilter(exceptions_filter)
+    raise_and_log(logger, ValueError)
+    raise_and_log(logger, KeyError)
+    raise_and_log(logger, ValueError)
+    assert len(logger.handlers[0].records) == 3
+
+
+def test_fingerprint_without_traceback():
+    assert error_logging.fingerprint((ValueError, ValueError(), None)) == (
+        ValueError,
+        None,
+        None,
+    )
+
+
+def test_log_in_background(logger):
+    handler = logger.handlers[0]
+    listener = error_logging.log_in_background(logger)
+    assert handler not in logger.handlers
+    raise_and_log(logger)
+    listener.stop()
+    assert len(handler.records) == 1
+    # Traceback is formatted before being sent to the queue
+    assert "ValueError: Error message" in handler.format(handler.records[0])
+    logger.handlers.clear()
+    logger.addHandler(handler)
+
+
+def test_flask_restx_server_errors(now):
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_error_handlers(api)
+
+    @api.route("/default_error")
+    class DefaultError(Resource):
+        def get(self):
+            raise Exception
+
+    handler = ListHandler()
+    application.logger.addHandler(handler)
+    error_logging.deduplicate(application.logger)
+    client = application.test_client()
+    for _ in range(3):
+        assert client.get("/default_error").status_code == 500
+    assert len(handler.records) == 1
@@ -0,0 +1,227 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.flask_restx
+import layaberr.starlette
+from layaberr import metrics, fingerprints
+from layaberr.core import ValidationErrors
+from layaberr.fingerprints import Aggregation, Fingerprint, fingerprint
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(fingerprints, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def aggregation():
+    aggregation = metrics.add_sink(Aggregation())
+    yield aggregation
+    metrics.remove_sink(aggregation)
+
+
+def test_fingerprint_of_list_errors():
+    exception = layaberr.starlette.ValidationFailed(
+        [{}, {}],
+        errors={
+            0: {"key 1": ["required"]},
+            1: {"key 1": ["required"], "key 2": ["invalid"]},
+        },
+    )
+    assert fingerprint(exception, 400) == Fingerprint(
+        "ValidationFailed",
+        400,
+        frozenset({"key 1", "key 2"}),
+        frozenset({"required", "invalid"}),
+    )
+
+
+def test_fingerprint_of_dict_errors():
+    exception = layaberr.flask_restx.ValidationFailed(
+        {}, errors={"key 1": ["required", "invalid"]}
+    )
+    assert fingerprint(exception, 400) == Fingerprint(
+        "ValidationFailed",
+        400,
+        frozenset({"key 1"}),
+        frozenset({"required", "invalid"}),
+    )
+
+
+def test_fingerprint_of_dict_errors_only_looks_at_first_items():
+    exception = layaberr.starlette.ValidationFailed(
+        [],
+        errors={
+            index: {f"key {index % 200}": ["required"]} for index in range(100_000)
+        },
+    )
+    assert fingerprint(exception, 400, max_items=2) == Fingerprint(
+        "ValidationFailed", 400, frozenset({"key 0", "key 1"}), frozenset({"required"})
+    )
+    assert len(fingerprint(exception, 400).field_names) == 100
+
+
+def test_fingerprint_of_validation_errors():
+    errors = ValidationErrors()
+    for index in range(1000):
+        errors.add("key 1", "required", item=index)
+    exception = layaberr.starlette.ValidationFailed([], errors=errors)
+    assert fingerprint(exception, 400) == Fingerprint(
+        "ValidationFailed", 400, frozenset({"key 1"}), frozenset({"required"})
+    )
+
+
+def test_fingerprint_of_encoded_errors():
+    exception = layaberr.starlette.ValidationFailed([], errors=b"[]")
+    assert fingerprint(exception, 400) == Fingerprint(
+        "ValidationFailed", 400, frozenset(), frozenset()
+    )
+
+
+def test_fingerprint_without_errors():
+    assert fingerprint(layaberr.starlette.Forbidden(), 403) == Fingerprint(
+        "Forbidden", 403, frozenset(), frozenset()
+    )
+
+
+def test_sliding_window(clock):
+    aggregation = Aggregation(window=60.0, slots=6)
+    first = Fingerprint("ValidationFailed", 400, frozenset({"key"}), frozenset())
+    second = Fingerprint("Forbidden", 403, frozenset(), frozenset())
+    aggregation.add(first)
+    clock[0] += 30
+    aggregation.add(first)
+    aggregation.add(second)
+    assert aggregation.counts() == {first: 2, second: 1}
+
+    # First error is out of the window
+    clock[0] += 35
+    assert aggregation.counts() == {first: 1, second: 1}
+
+    # Oldest slot is reused
+    clock[0] += 30
+    aggregation.add(second)
+    assert aggregation.counts() == {second: 1}
+
+
+def test_max_fingerprints(clock):
+    aggregation = Aggregation(max_fingerprints=1)
+    first = Fingerprint("Unauthorized", 401, frozenset(), frozenset())
+    second = Fingerprint("Forbidden", 403, frozenset(), frozenset())
+    aggregation.add(first)
+    aggregation.add(second)
+    aggregation.add(first)
+    assert aggregation.counts() == {first: 2}
+    assert aggregation.dropped() == 1
+    assert aggregation.top()["total"] == 3
+
+
+def test_max_items(clock):
+    aggregation = Aggregation(max_items=1)
+    exception = layaberr.starlette.ValidationFailed(
+        [], errors={0: {"key 1": ["required"]}, 1: {"key 2": ["required"]}}
+    )
+    aggregation.observe_exception(exception, 400, 0.1, None)
+    assert aggregation.counts() == {
+        Fingerprint(
+            "ValidationFailed", 400, frozenset({"key 1"}), frozenset({"required"})
+        ): 1
+    }
+
+
+def test_observe_without_exception():
+    aggregation = Aggregation()
+    aggregation.observe("Forbidden", 403, 0.1, None)
+    assert aggregation.counts() == {
+        Fingerprint("Forbidden", 403, frozenset(), frozenset()): 1
+    }
+
+
+def test_starlette_endpoint(aggregation):
+    app = Starlette(exception_handlers=layaberr.starlette.exception_handlers)
+    app.add_route("/errors", layaberr.starlette.aggregation_endpoint(aggregation))
+
+    @app.route("/missing")
+    def missing(request):
+        raise layaberr.starlette.ValidationFailed(
+            [{}, {}],
+            errors={0: {"key 1": ["required"]}, 1: {"key 1": ["required"]}},
+        )
+
+    @app.route("/invalid")
+    def invalid(request):
+        raise layaberr.starlette.ValidationFailed({}, errors={"key 2": ["invalid"]})
+
+    client = TestClient(app, raise_server_exceptions=False)
+    for _ in range(3):
+        client.get("/missing")
+    client.get("/invalid")
+
+    response = client.get("/errors", params={"top": 1})
+    assert response.status_code == 200
+    assert response.json() == {
+        "window": 60.0,
+        "total": 4,
+        "fingerprints": [
+            {
+                "exception": "ValidationFailed",
+                "status": 400,
+                "field_names": ["key 1"],
+                "codes": ["required"],
+                "count": 3,
+            }
+        ],
+        "field_names": [{"field_name": "key 1", "count": 3}],
+        "codes": [{"code": "required", "count": 3}],
+    }
+
+
+def test_starlette_endpoint_with_invalid_top(aggregation):
+    app = Starlette(exception_handlers=layaberr.starlette.exception_handlers)
+    app.add_route("/errors", layaberr.starlette.aggregation_endpoint(aggregation))
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.get("/errors", params={"top": "all"})
+    assert response.status_code == 400
+    assert response.json() == "top must be an integer."
+
+
+def test_flask_restx_resource(aggregation):
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_error_handlers(api)
+    layaberr.flask_restx.add_aggregation_resource(api, aggregation)
+
+    @api.route("/validation_failed")
+    class ValidationFailed(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed(
+                {}, errors={"key 1": ["required"]}
+            )
+
+    with application.test_client() as client:
+        client.get("/validation_failed")
+        response = client.get("/errors")
+    assert response.status_code == 200
+    assert response.json == {
+        "window": 60.0,
+        "total": 1,
+        "fingerprints": [
+            {
+                "exception": "ValidationFailed",
+                "status": 400,
+                "field_names": ["key 1"],
+                "codes": ["required"],
+                "count": 1,
+            }
+        ],
+        "field_names": [{"field_name": "key 1", "count": 1}],
+        "codes": [{"code": "required", "count": 1}],
+    }
@@ -1,10 +1,12 @@
 import http
 
+import flask
 import pytest
 from flask import Flask
 from flask_restx import Resource, Api
 
 import layaberr.flask_restx
+from layaberr.core import Retention
 
 
 @pytest.fixture
@@ -37,6 +39,56 @@ def test_custom_exception(client):
     assert response.json == "This is the error"
 
 
+def test_other_representation_receives_message():
+    application = Flask(__name__)
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    @api.representation("application/xml")
+    def output_xml(data, code, headers=None):
+        return flask.Response(f"<r>{data}</r>", code, headers)
+
+    layaberr.flask_restx.add_error_handler(
+        api, NotImplementedError, http.HTTPStatus.NOT_IMPLEMENTED
+    )
+
+    @api.route("/not_implemented")
+    class NotImplementedResource(Resource):
+        def get(self):
+            raise NotImplementedError("This is the error")
+
+    client = application.test_client()
+    response = client.get("/not_implemented", headers={"Accept": "application/xml"})
+    assert response.status_code == 501
+    assert response.content_type == "application/xml"
+    assert response.data == b"<r>This is the error</r>"
+    response = client.get("/not_implemented", headers={"Accept": "application/json"})
+    assert response.json == "This is the error"
+
+
+def test_json_representation_is_wrapped_once():
+    api = Api()
+    layaberr.flask_restx.add_error_handler(
+        api, NotImplementedError, http.HTTPStatus.NOT_IMPLEMENTED
+    )
+    output_json = api.representations["application/json"]
+    layaberr.flask_restx.add_error_handler(
+        api, NotImplementedError, http.HTTPStatus.NOT_IMPLEMENTED
+    )
+    assert api.representations["application/json"] is output_json
+
+
+def test_json_representation_still_serialize(app):
+    api = Api()
+    layaberr.flask_restx.add_error_handler(
+        api, NotImplementedError, http.HTTPStatus.NOT_IMPLEMENTED
+    )
+    with app.test_request_context():
+        response = api.representations["application/json"]({"key": "value"}, 200)
+    assert response.get_data() == b'{"key": "value"}\n'
+
+
 def test_open_api_definition(client):
     response = client.get("/swagger.json")
     assert response.json == {
@@ -84,3 +136,99 @@ def test_validation_failed_str():
         )
         == """Errors: {'field': ['first error']}\nReceived: {'field': 'value'}"""
     )
+
+
+def test_validation_errors_to_list():
+    errors = layaberr.flask_restx.ValidationErrors()
+    errors.add("a field", "an error", item=1)
+    assert layaberr.flask_restx.ValidationFailed.to_list(errors) == [
+        {"item": 2, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_empty_validation_errors_use_message():
+    failed_validation = layaberr.flask_restx.ValidationFailed(
+        {}, errors=layaberr.flask_restx.ValidationErrors(), message="Error message"
+    )
+    assert layaberr.flask_restx.ValidationFailed.to_list(failed_validation.errors) == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
+
+
+def test_validation_failed_str_is_bounded():
+    received_data = [{"field": "value" * 1000} for _ in range(100_000)]
+    exception = layaberr.flask_restx.ValidationFailed(
+        received_data, {index: {"field": ["error"]} for index in range(100_000)}
+    )
+    errors, received = str(exception).split("\n")
+    assert len(errors) <= len("Errors: ") + 1000
+    assert errors.endswith(", ...}")
+    assert len(received) == len("Received: ") + 1000
+    assert received.endswith("...")
+
+
+def test_validation_failed_preview_length(monkeypatch):
+    monkeypatch.setattr(layaberr.flask_restx.ValidationFailed, "preview_length", 10)
+    exception = layaberr.flask_restx.ValidationFailed(
+        {"field": "value"}, {"field": ["first error"]}
+    )
+    assert str(exception) == "Errors: {'field...\nReceived: {'field..."
+
+
+def test_validation_failed_received_data_digest():
+    exception = layaberr.flask_restx.ValidationFailed(
+        {"field": "value"}, {"field": ["first error"]}
+    )
+    assert exception._received_data_digest is None
+    assert (
+        exception.received_data_digest
+        == "2071b50f9ee47f5a7cc12d0d0b7bb5b5f963fc2fcc97e7905a862702bbdfd57d"
+    )
+    assert exception._received_data_digest == exception.received_data_digest
+
+
+def test_validation_failed_without_received_data(monkeypatch):
+    monkeypatch.setattr(layaberr.flask_restx.ValidationFailed, "preview_digest", True)
+    exception = layaberr.flask_restx.ValidationFailed(
+        {"field": "value"}, {"field": ["first error"]}, retention=Retention.preview
+    )
+    assert exception.received_data is None
+    assert exception.received_data_preview == "{'field': 'value'}"
+    assert (
+        exception.received_data_digest
+        == "2071b50f9ee47f5a7cc12d0d0b7bb5b5f963fc2fcc97e7905a862702bbdfd57d"
+    )
+    assert (
+        str(exception)
+        == """Errors: {'field': ['first error']}\nReceived: {'field': 'value'}"""
+    )
+
+
+def test_collect_validation_errors():
+    with pytest.raises(layaberr.flask_restx.ValidationFailed) as exception_info:
+        with layaberr.flask_restx.ValidationFailed.collect(
+            [{}, {}], max_errors=10, retention=Retention.preview
+        ) as errors:
+            for index in range(2):
+                errors.add("key", "Missing data for required field.", item=index)
+    assert exception_info.value.received_data is None
+    assert exception_info.value.to_list(exception_info.value.errors) == [
+        {
+            "item": 1,
+            "field_name": "key",
+            "messages": ["Missing data for required field."],
+        },
+        {
+            "item": 2,
+            "field_name": "key",
+            "messages": ["Missing data for required field."],
+        },
+    ]
+
+
+def test_retention():
+    exception = layaberr.flask_restx.ValidationFailed(
+        [{"key": 1}, {"key": 2}], errors={1: {"key": ["an error"]}}, retention="drop"
+    )
+    assert exception.received_data is None
+    assert str(exception) == "Errors: {1: {'key': ['an error']}}\nReceived: "
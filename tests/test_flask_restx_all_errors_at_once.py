@@ -141,7 +141,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -168,7 +168,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -195,7 +195,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -222,7 +222,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -249,7 +249,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -276,7 +276,7 @@ def test_open_api_definition(client):
                 "get": {
                     "responses": {
                         "400": {
-                            "description": "Validation failed.",
+                            "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
                             "schema": {
                                 "type": "array",
                                 "items": {"$ref": "#/definitions/ValidationFailed"},
@@ -344,3 +344,42 @@ def test_open_api_definition(client):
             "Exception": {"schema": {"type": "string"}},
         },
     }
+
+
+def test_unauthorized_body_is_cached(client):
+    client.get("/unauthorized")
+    cache_info = layaberr.flask_restx.serializers.cache_info()
+    response = client.get("/unauthorized")
+    assert response.status_code == 401
+    assert response.json.startswith("401 Unauthorized")
+    assert layaberr.flask_restx.serializers.cache_info().hits == cache_info.hits + 1
+    assert layaberr.flask_restx.serializers.cache_info().misses == cache_info.misses
+
+
+def test_messages_are_not_cached():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_error_handlers(api)
+
+    @api.route("/default_error/<int:index>")
+    class DefaultError(Resource):
+        def get(self, index):
+            raise Exception(f"Error {index}")
+
+    @api.route("/unauthorized/<int:index>")
+    class UnauthorizedWithDescription(Resource):
+        def get(self, index):
+            raise Unauthorized(description=f"Token {index} expired")
+
+    client = application.test_client()
+    cache_info = layaberr.flask_restx.serializers.cache_info()
+    for index in range(3):
+        assert client.get(f"/default_error/{index}").json == f"Error {index}"
+        assert (
+            client.get(f"/unauthorized/{index}").json
+            == f"401 Unauthorized: Token {index} expired"
+        )
+    assert layaberr.flask_restx.serializers.cache_info() == cache_info
@@ -0,0 +1,100 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+from layaberr.core import MessageCatalog, ValidationErrors
+
+catalog = MessageCatalog()
+REQUIRED = catalog.register("required", "Missing data for required field.")
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(
+        api, catalog=catalog, codes=True
+    )
+
+    @api.route("/validation_failed_list")
+    @api.doc(**error_responses)
+    class ValidationFailedListError(Resource):
+        def get(self):
+            errors = ValidationErrors()
+            errors.add("a field", REQUIRED, item=0)
+            errors.add("a field", REQUIRED, item=1)
+            raise layaberr.flask_restx.ValidationFailed([{}, {}], errors=errors)
+
+    return application
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json == {
+        "errors": [
+            {"item": 1, "field_name": "a field", "messages": ["required"]},
+            {"item": 2, "field_name": "a field", "messages": ["required"]},
+        ],
+        "codes": {"required": "Missing data for required field."},
+    }
+
+
+def test_open_api_definition(client):
+    response = client.get("/swagger.json")
+    assert response.json["paths"]["/validation_failed_list"]["get"]["responses"][
+        "400"
+    ] == {
+        "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
+        "schema": {"$ref": "#/definitions/CodedValidationFailed"},
+    }
+    assert response.json["definitions"]["CodedValidationFailed"] == {
+        "properties": {
+            "errors": {
+                "type": "array",
+                "items": {"$ref": "#/definitions/ValidationFailed"},
+            },
+            "codes": {
+                "type": "object",
+                "description": "Message per code reported in errors messages.",
+                "example": {
+                    "sample_code": "This is the reason why this field was not validated."
+                },
+            },
+        },
+        "type": "object",
+    }
+
+
+def test_inlined_messages():
+    application = Flask(__name__)
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_failed_validation_handler(api, catalog=catalog)
+
+    @api.route("/validation_failed")
+    class ValidationFailed(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed(
+                {}, errors={"a field": [REQUIRED]}
+            )
+
+    response = application.test_client().get("/validation_failed")
+    assert response.json == [
+        {
+            "item": 1,
+            "field_name": "a field",
+            "messages": ["Missing data for required field."],
+        }
+    ]
+
+
+def test_codes_without_catalog():
+    with pytest.raises(ValueError) as exception_info:
+        layaberr.flask_restx.add_failed_validation_handler(Api(), codes=True)
+    assert str(exception_info.value) == "A message catalog is required to send codes."
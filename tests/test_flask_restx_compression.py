@@ -0,0 +1,95 @@
+import gzip
+
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+from layaberr import metrics
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(
+        api, compression_threshold=100
+    )
+
+    @api.route("/validation_failed_list")
+    @api.doc(**error_responses)
+    class ValidationFailedListError(Resource):
+        def get(self):
+            errors = {index: {"a field": ["an error"]} for index in range(100)}
+            raise layaberr.flask_restx.ValidationFailed([], errors=errors)
+
+    @api.route("/validation_failed_message")
+    @api.doc(**error_responses)
+    class ValidationFailedMessageError(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed({}, message="Error message")
+
+    @api.route("/exception")
+    @api.doc(**error_responses)
+    class DefaultError(Resource):
+        def get(self):
+            raise Exception("A large error message " * 10)
+
+    return application
+
+
+def test_validation_failed_compressed(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Content-Type"] == "application/json"
+    content = gzip.decompress(response.get_data())
+    assert content.startswith(
+        b'[{"item":1,"field_name":"a field","messages":["an error"]},'
+    )
+
+
+def test_validation_failed_not_accepted(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert len(response.json) == 100
+
+
+def test_small_body_not_compressed(client):
+    response = client.get(
+        "/validation_failed_message", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 400
+    assert "Content-Encoding" not in response.headers
+    assert response.json == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
+
+
+def test_exception_compressed(client):
+    response = client.get("/exception", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 500
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == (
+        b'"' + b"A large error message " * 10 + b'"'
+    )
+
+
+def test_compressed_size_measured(client):
+    sink = metrics.add_sink(metrics.InMemorySink())
+    try:
+        response = client.get(
+            "/validation_failed_list", headers={"Accept-Encoding": "gzip"}
+        )
+    finally:
+        metrics.remove_sink(sink)
+    assert sink.sizes[("ValidationFailed", 400)].sum == len(response.get_data())
@@ -0,0 +1,71 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(api, echo_length=10)
+
+    @api.route("/validation_failed_list")
+    @api.doc(**error_responses)
+    class ValidationFailedListError(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed(
+                [{"a field": "valid"}, {"a field": "a very long value"}],
+                errors={1: {"a field": ["Too long."], "other": ["Missing data."]}},
+            )
+
+    return application
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json == [
+        {
+            "item": 2,
+            "field_name": "a field",
+            "messages": ["Too long."],
+            "received": "a very ...",
+        },
+        {"item": 2, "field_name": "other", "messages": ["Missing data."]},
+    ]
+
+
+def test_validation_failed_list_as_ndjson(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert response.data.splitlines()[0] == (
+        b'{"item":2,"field_name":"a field","messages":["Too long."],"received":"a very ..."}'
+    )
+
+
+def test_open_api_definition(client):
+    response = client.get("/swagger.json")
+    assert response.json["paths"]["/validation_failed_list"]["get"]["responses"][
+        "400"
+    ] == {
+        "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
+        "schema": {
+            "type": "array",
+            "items": {"$ref": "#/definitions/EchoedValidationFailed"},
+        },
+    }
+    assert response.json["definitions"]["EchoedValidationFailed"]["properties"][
+        "received"
+    ] == {
+        "description": "Received value of the field (truncated if too large).",
+        "example": "sample value",
+        "type": "object",
+    }
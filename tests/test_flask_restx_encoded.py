@@ -0,0 +1,95 @@
+from wsgiref.util import setup_testing_defaults
+from wsgiref.validate import validator
+
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+from layaberr.core import EncodedErrors
+
+body = b'[{"item":1,"field_name":"a field","messages":["an error"]}]'
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(api)
+
+    @api.route("/validation_failed_memoryview")
+    @api.doc(**error_responses)
+    class ValidationFailedMemoryView(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed([], errors=memoryview(body))
+
+    @api.route("/validation_failed_ndjson")
+    @api.doc(**error_responses)
+    class ValidationFailedNDJSON(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed(
+                [],
+                errors=EncodedErrors(
+                    b'{"item":1,"field_name":"a field","messages":["an error"]}\n',
+                    "application/x-ndjson",
+                ),
+            )
+
+    return application
+
+
+def test_sent_as_is(client):
+    response = client.get("/validation_failed_memoryview")
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.headers["Content-Length"] == str(len(body))
+    assert response.get_data() == body
+
+
+def test_sent_as_bytes_to_wsgi_server(app):
+    environ = {
+        "PATH_INFO": "/validation_failed_memoryview",
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": "",
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    # Ensure the response complies with WSGI specification (PEP 3333)
+    result = validator(app)(
+        environ, lambda status, headers: statuses.append(status) or (lambda data: None)
+    )
+    try:
+        assert b"".join(result) == body
+    finally:
+        result.close()
+    assert statuses == ["400 BAD REQUEST"]
+
+
+def test_encoded_media_type(client):
+    response = client.get(
+        "/validation_failed_ndjson", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.get_data() == (
+        b'{"item":1,"field_name":"a field","messages":["an error"]}\n'
+    )
+
+
+def test_decoded_if_not_accepted(client):
+    response = client.get("/validation_failed_ndjson")
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json == [
+        {"item": 1, "field_name": "a field", "messages": ["an error"]}
+    ]
+
+
+def test_str():
+    exception = layaberr.flask_restx.ValidationFailed({}, errors=body)
+    assert str(exception) == (
+        "Errors: EncodedErrors(59 bytes of application/json)\nReceived: {}"
+    )
@@ -0,0 +1,166 @@
+import flask
+import flask_restx
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+from werkzeug.exceptions import Forbidden, Unauthorized
+
+import layaberr.flask_restx
+
+
+class NotHandledFast(Exception):
+    pass
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application, serve_challenge_on_401=True)
+
+    @api.representation("text/csv")
+    def output_csv(data, code, headers=None):
+        return flask.Response("csv", code, headers)
+
+    # Handlers are resolved by order of registration (this one before the Exception handler)
+    @api.errorhandler(NotHandledFast)
+    def handle_not_handled_fast(e):
+        return {"message": "not handled fast"}, 418
+
+    error_responses = layaberr.flask_restx.add_error_handlers(api, fast_path=True)
+
+    @api.route("/unauthorized")
+    @api.doc(**error_responses)
+    class UnauthorizedResource(Resource):
+        def get(self):
+            raise Unauthorized()
+
+    @api.route("/forbidden")
+    class ForbiddenResource(Resource):
+        def get(self):
+            raise Forbidden()
+
+    @api.route("/aborted")
+    class AbortedResource(Resource):
+        def get(self):
+            flask_restx.abort(403, "Aborted.")
+
+    @api.route("/default_error")
+    class DefaultErrorResource(Resource):
+        def get(self):
+            raise Exception("Error message")
+
+    @api.route("/not_handled_fast")
+    class NotHandledFastResource(Resource):
+        def get(self):
+            raise NotHandledFast()
+
+    @api.route("/validation_failed")
+    class ValidationFailedResource(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed(
+                {}, errors={"field": ["Invalid."]}
+            )
+
+    return application
+
+
+def test_unauthorized(client):
+    response = client.get("/unauthorized")
+    assert response.status_code == 401
+    assert response.content_type == "application/json"
+    assert response.json == (
+        "401 Unauthorized: The server could not verify that you are authorized to access the URL requested. "
+        "You either supplied the wrong credentials (e.g. a bad password), or your browser "
+        "doesn't understand how to supply the credentials required."
+    )
+    assert response.headers["WWW-Authenticate"] == 'Basic realm="flask-restx"'
+
+
+def test_forbidden(client):
+    response = client.get("/forbidden")
+    assert response.status_code == 403
+    assert response.content_type == "application/json"
+    assert response.json == (
+        "403 Forbidden: You don't have the permission to access the requested resource. "
+        "It is either read-protected or not readable by the server."
+    )
+
+
+def test_forbidden_sent_as_json_whatever_the_accepted_media_type(client):
+    response = client.get("/forbidden", headers={"Accept": "text/csv"})
+    assert response.status_code == 403
+    assert response.content_type == "application/json"
+
+
+def test_aborted_requests_are_handled_by_flask_restx(client):
+    response = client.get("/aborted")
+    assert response.status_code == 403
+    assert response.json == {"message": "Aborted."}
+
+
+def test_default_error(client, caplog):
+    sent_exceptions = []
+
+    def on_exception(sender, exception):
+        sent_exceptions.append(exception)
+
+    flask.got_request_exception.connect(on_exception)
+    try:
+        response = client.get("/default_error")
+    finally:
+        flask.got_request_exception.disconnect(on_exception)
+    assert response.status_code == 500
+    assert response.json == "Error message"
+    assert [str(exception) for exception in sent_exceptions] == ["Error message"]
+    assert "Exception on /default_error [GET]" in caplog.messages
+
+
+def test_other_errors_are_handled_by_flask_restx(client):
+    response = client.get("/not_handled_fast")
+    assert response.status_code == 418
+    assert response.json == {"message": "not handled fast"}
+
+
+def test_validation_failed(client):
+    response = client.get("/validation_failed")
+    assert response.status_code == 400
+    assert response.content_type == "application/json"
+    assert response.data == b'[{"item":1,"field_name":"field","messages":["Invalid."]}]'
+
+
+def test_validation_failed_with_other_representation(client):
+    response = client.get("/validation_failed", headers={"Accept": "text/csv"})
+    assert response.status_code == 400
+    assert response.content_type == "text/csv"
+    assert response.data == b"csv"
+
+
+def test_fast_path_is_added_once():
+    api = Api(Flask(__name__))
+    layaberr.flask_restx.add_error_handler(
+        api, Forbidden, layaberr.flask_restx.http.HTTPStatus.FORBIDDEN, fast_path=True
+    )
+    handle_error = api.handle_error
+    layaberr.flask_restx.add_failed_validation_handler(api, fast_path=True)
+    assert api.handle_error is handle_error
+
+
+def test_errors_without_handler_are_handled_by_flask_restx():
+    application = Flask(__name__)
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_error_handler(
+        api, Forbidden, layaberr.flask_restx.http.HTTPStatus.FORBIDDEN, fast_path=True
+    )
+
+    @api.route("/not_found")
+    class NotFoundResource(Resource):
+        def get(self):
+            flask.abort(404)
+
+    response = application.test_client().get("/not_found")
+    assert response.status_code == 404
+    assert response.json["message"].startswith("The requested URL was not found")
@@ -0,0 +1,87 @@
+import msgpack
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(api, max_items=1)
+
+    @api.route("/validation_failed_list")
+    @api.doc(**error_responses)
+    class ValidationFailedListError(Resource):
+        def get(self):
+            errors = {index: {"a field": ["an error"]} for index in range(3)}
+            raise layaberr.flask_restx.ValidationFailed([], errors=errors)
+
+    @api.route("/items")
+    class Items(Resource):
+        def get(self):
+            return [{"key": "value 1"}, {"key": "value 2"}]
+
+    @api.route("/item")
+    class Item(Resource):
+        def get(self):
+            return {"key": "value 1"}
+
+    return application
+
+
+def test_ndjson(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.get_data() == (
+        b'{"item":1,"field_name":"a field","messages":["an error"]}\n'
+        b'{"summary":{"total":3,"fields":{"a field":3}}}\n'
+    )
+
+
+def test_msgpack(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(response.get_data()) == {
+        "errors": [{"item": 1, "field_name": "a field", "messages": ["an error"]}],
+        "summary": {"total": 3, "fields": {"a field": 3}},
+    }
+
+
+def test_json_by_default(client):
+    response = client.get("/validation_failed_list", headers={"Accept": "*/*"})
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json["summary"] == {"total": 3, "fields": {"a field": 3}}
+
+
+def test_resources_are_not_sent_in_other_formats(client):
+    response = client.get("/items", headers={"Accept": "application/x-ndjson"})
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json == [{"key": "value 1"}, {"key": "value 2"}]
+    response = client.get("/item", headers={"Accept": "application/msgpack"})
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json == {"key": "value 1"}
+
+
+def test_open_api_definition(client):
+    response = client.get("/swagger.json")
+    assert response.json["produces"] == ["application/json"]
+    assert response.json["paths"]["/validation_failed_list"]["get"]["responses"]["400"][
+        "description"
+    ] == (
+        "Validation failed. Sent as application/json, application/x-ndjson, "
+        "application/msgpack according to Accept request header."
+    )
@@ -0,0 +1,156 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api, Namespace
+
+import layaberr.flask_restx
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    namespace = Namespace("errors")
+
+    @namespace.route("/first")
+    class First(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed({}, message="Error message")
+
+    @namespace.route("/second")
+    @namespace.response(400, "Specific documentation")
+    class Second(Resource):
+        def get(self):
+            pass
+
+    @namespace.route("/hidden", doc=False)
+    class Hidden(Resource):
+        def get(self):
+            pass
+
+    @namespace.route("/hidden_class")
+    @namespace.doc(False)
+    class HiddenClass(Resource):
+        def get(self):
+            pass
+
+    api.add_namespace(namespace)
+    error_responses = layaberr.flask_restx.add_error_handlers(api)
+    layaberr.flask_restx.add_error_responses(namespace, error_responses)
+    return application
+
+
+def test_error_handler(client):
+    response = client.get("/errors/first")
+    assert response.status_code == 400
+    assert response.json == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
+
+
+def test_open_api_definition(client):
+    paths = client.get("/swagger.json").json["paths"]
+    assert list(paths) == ["/errors/first", "/errors/second"]
+    first_responses = paths["/errors/first"]["get"]["responses"]
+    assert sorted(first_responses) == ["400", "401", "403", "500"]
+    assert first_responses["400"] == {
+        "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
+        "schema": {
+            "type": "array",
+            "items": {"$ref": "#/definitions/ValidationFailed"},
+        },
+    }
+    second_responses = paths["/errors/second"]["get"]["responses"]
+    assert sorted(second_responses) == ["400", "401", "403", "500"]
+    assert second_responses["400"]["description"] == "Specific documentation"
+
+
+def test_error_handlers_are_added_once_per_api():
+    api = Api()
+    error_responses = layaberr.flask_restx.add_error_handlers(api)
+    assert layaberr.flask_restx.add_error_handlers(api) is error_responses
+    assert layaberr.flask_restx.add_error_handlers(api, max_items=1) is not (
+        error_responses
+    )
+    assert layaberr.flask_restx.add_error_handlers(Api()) is not error_responses
+
+
+def test_models_are_shared():
+    assert (
+        layaberr.flask_restx.ValidationFailed.list_item_model()["item"]
+        is layaberr.flask_restx.ValidationFailed.list_item_model()["item"]
+    )
+    assert (
+        layaberr.flask_restx.ValidationFailed.summary_model()["total"]
+        is layaberr.flask_restx.ValidationFailed.summary_model()["total"]
+    )
+    with pytest.raises(TypeError):
+        layaberr.flask_restx.ValidationFailed.list_item_model()["item"] = None
+
+
+def test_resource_added_to_several_namespaces():
+    application = Flask(__name__)
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    documented = Namespace("documented")
+    undocumented = Namespace("undocumented")
+
+    @api.response(200, "Success")
+    class Shared(Resource):
+        def get(self):
+            return "shared"
+
+    documented.add_resource(Shared, "/shared")
+    undocumented.add_resource(Shared, "/shared")
+    api.add_namespace(documented)
+    api.add_namespace(undocumented)
+    error_responses = layaberr.flask_restx.add_error_handlers(api)
+    layaberr.flask_restx.add_error_responses(documented, error_responses)
+
+    client = application.test_client()
+    paths = client.get("/swagger.json").json["paths"]
+    assert sorted(paths["/documented/shared"]["get"]["responses"]) == [
+        "200",
+        "400",
+        "401",
+        "403",
+        "500",
+    ]
+    assert paths["/documented/shared"]["get"]["operationId"] == "get_shared"
+    assert sorted(paths["/undocumented/shared"]["get"]["responses"]) == ["200"]
+    assert Shared.__apidoc__ == {"responses": {"200": ("Success", None, {})}}
+    assert client.get("/documented/shared").json == "shared"
+
+
+def test_resource_added_afterwards():
+    application = Flask(__name__)
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    namespace = Namespace("errors")
+    api.add_namespace(namespace)
+    error_responses = layaberr.flask_restx.add_error_handlers(api)
+    layaberr.flask_restx.add_error_responses(namespace, error_responses)
+
+    @namespace.route("/added_afterwards")
+    class AddedAfterwards(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed({}, message="Error message")
+
+    client = application.test_client()
+    paths = client.get("/swagger.json").json["paths"]
+    assert sorted(paths["/errors/added_afterwards"]["get"]["responses"]) == [
+        "400",
+        "401",
+        "403",
+        "500",
+    ]
+    assert "__apidoc__" not in vars(AddedAfterwards)
+    response = client.get("/errors/added_afterwards")
+    assert response.status_code == 400
+    assert response.json == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
@@ -0,0 +1,82 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+
+import layaberr.flask_restx
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+
+    error_responses = layaberr.flask_restx.add_error_handlers(
+        api, max_items=2, max_messages=1
+    )
+
+    @api.route("/validation_failed_list")
+    @api.doc(**error_responses)
+    class ValidationFailedListError(Resource):
+        def get(self):
+            received_data = [{"key 1": "value 1"}, {"key 1": "value 2"}]
+            errors = {
+                0: {"a field": ["an error 1."]},
+                1: {
+                    "a field": ["an error 2."],
+                    "another_field": ["first error 2", "second error 2"],
+                },
+            }
+            raise layaberr.flask_restx.ValidationFailed(received_data, errors=errors)
+
+    return application
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json == {
+        "errors": [
+            {"item": 1, "field_name": "a field", "messages": ["an error 1."]},
+            {"item": 2, "field_name": "a field", "messages": ["an error 2."]},
+        ],
+        "summary": {"total": 3, "fields": {"a field": 2, "another_field": 1}},
+    }
+
+
+def test_open_api_definition(client):
+    response = client.get("/swagger.json")
+    assert response.json["paths"]["/validation_failed_list"]["get"]["responses"][
+        "400"
+    ] == {
+        "description": "Validation failed. Sent as application/json, application/x-ndjson, application/msgpack according to Accept request header.",
+        "schema": {"$ref": "#/definitions/SummarizedValidationFailed"},
+    }
+    definitions = response.json["definitions"]
+    assert definitions["SummarizedValidationFailed"] == {
+        "properties": {
+            "errors": {
+                "type": "array",
+                "items": {"$ref": "#/definitions/ValidationFailed"},
+            },
+            "summary": {"$ref": "#/definitions/ValidationFailedSummary"},
+        },
+        "type": "object",
+    }
+    assert definitions["ValidationFailedSummary"] == {
+        "properties": {
+            "total": {
+                "type": "integer",
+                "description": "Total number of errors.",
+                "example": 1,
+            },
+            "fields": {
+                "type": "object",
+                "description": "Number of errors per field name.",
+                "example": {"sample_field_name": 1},
+            },
+        },
+        "type": "object",
+    }
@@ -0,0 +1,68 @@
+import msgpack
+
+from layaberr import formats
+from layaberr.core import iter_errors
+
+
+def test_negotiate_default():
+    assert formats.negotiate("") == "application/json"
+    assert formats.negotiate("*/*") == "application/json"
+    assert formats.negotiate("text/html") == "application/json"
+
+
+def test_negotiate_ndjson():
+    assert formats.negotiate("application/x-ndjson") == "application/x-ndjson"
+
+
+def test_negotiate_quality():
+    assert (
+        formats.negotiate("application/json;q=0.5, application/msgpack")
+        == "application/msgpack"
+    )
+    assert (
+        formats.negotiate("application/json, application/msgpack;q=0.9")
+        == "application/json"
+    )
+
+
+def test_negotiate_invalid_quality():
+    assert (
+        formats.negotiate("application/json;q=invalid, application/x-ndjson;q=0.1")
+        == "application/x-ndjson"
+    )
+
+
+def test_iter_ndjson_chunks():
+    errors = {index: {"a field": ["an error"]} for index in range(3)}
+    assert list(formats.iter_ndjson(iter_errors(errors), {}, 2)) == [
+        b'{"item":1,"field_name":"a field","messages":["an error"]}\n'
+        b'{"item":2,"field_name":"a field","messages":["an error"]}\n',
+        b'{"item":3,"field_name":"a field","messages":["an error"]}\n',
+    ]
+
+
+def test_render_ndjson_with_summary():
+    errors = {index: {"a field": ["an error"]} for index in range(3)}
+    assert formats.render(errors, "application/x-ndjson", max_items=1) == (
+        b'{"item":1,"field_name":"a field","messages":["an error"]}\n'
+        b'{"summary":{"total":3,"fields":{"a field":3}}}\n'
+    )
+
+
+def test_render_msgpack():
+    assert msgpack.unpackb(
+        formats.render({"a field": ["an error"]}, "application/msgpack")
+    ) == [{"item": 1, "field_name": "a field", "messages": ["an error"]}]
+
+
+def test_render_json():
+    assert formats.render({"a field": ["an error"]}, "application/json") == (
+        b'[{"item":1,"field_name":"a field","messages":["an error"]}]'
+    )
+
+
+def test_accepts():
+    assert formats.accepts("", "application/msgpack")
+    assert formats.accepts("*/*", "application/msgpack")
+    assert formats.accepts("application/*;q=0.1", "application/msgpack")
+    assert not formats.accepts("application/json", "application/msgpack")
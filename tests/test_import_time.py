@@ -0,0 +1,70 @@
+import subprocess
+import sys
+
+import pytest
+
+# -X importtime option is only available since Python 3.7
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="requires python -X importtime"
+)
+
+
+def imported_modules(module: str) -> dict:
+    """
+    :return: Cumulative import time (in microseconds) per imported module, as reported by python -X importtime.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stderr
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_flask_restx_exceptions_do_not_import_framework():
+    modules = imported_modules("layaberr.flask_restx")
+    assert "layaberr.flask_restx" in modules
+    assert not [
+        module
+        for module in modules
+        if module.split(".")[0] in ("flask", "flask_restx", "werkzeug", "starlette")
+    ]
+
+
+def test_core_does_not_import_framework():
+    modules = imported_modules("layaberr.core")
+    assert "layaberr.core" in modules
+    assert not [
+        module
+        for module in modules
+        if module.split(".")[0] in ("flask", "flask_restx", "werkzeug", "starlette")
+    ]
+
+
+def test_starlette_does_not_import_flask():
+    modules = imported_modules("layaberr.starlette")
+    assert "layaberr.starlette" in modules
+    assert not [
+        module
+        for module in modules
+        if module.split(".")[0] in ("flask", "flask_restx", "werkzeug")
+    ]
+
+
+def test_optional_dependencies_are_not_imported():
+    for module in ("layaberr.flask_restx", "layaberr.starlette"):
+        modules = imported_modules(module)
+        assert module in modules
+        assert not [
+            module
+            for module in modules
+            if module.split(".")[0] in ("orjson", "msgspec", "brotli", "msgpack")
+        ]
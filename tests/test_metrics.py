@@ -0,0 +1,163 @@
+import pytest
+from flask import Flask
+from flask_restx import Resource, Api
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+from werkzeug.exceptions import Forbidden
+
+import layaberr.flask_restx
+import layaberr.starlette
+from layaberr import metrics
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.add_sink(metrics.InMemorySink())
+    yield sink
+    metrics.remove_sink(sink)
+
+
+@pytest.fixture
+def starlette_client():
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=True
+            ),
+        }
+    )
+
+    @app.route("/unauthorized")
+    def unauthorized(request):
+        raise layaberr.starlette.Unauthorized
+
+    @app.route("/default_error")
+    def default_error(request):
+        raise Exception("Error message")
+
+    @app.route("/validation_failed")
+    def validation_failed(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def app():
+    application = Flask(__name__)
+    application.testing = True
+    application.config["PROPAGATE_EXCEPTIONS"] = False
+    application.config["ERROR_INCLUDE_MESSAGE"] = False
+    api = Api(application)
+    layaberr.flask_restx.add_error_handlers(api)
+
+    @api.route("/forbidden")
+    class ForbiddenError(Resource):
+        def get(self):
+            raise Forbidden
+
+    @api.route("/validation_failed")
+    class ValidationFailedError(Resource):
+        def get(self):
+            raise layaberr.flask_restx.ValidationFailed({}, message="Error message")
+
+    return application
+
+
+def test_starlette_handlers_are_measured(sink, starlette_client):
+    starlette_client.get("/unauthorized")
+    starlette_client.get("/unauthorized")
+    starlette_client.get("/default_error")
+    starlette_client.get("/validation_failed")
+    assert sink.counts == {
+        ("Unauthorized", 401): 2,
+        ("Exception", 500): 1,
+        ("ValidationFailed", 400): 1,
+    }
+    assert sink.sizes[("Unauthorized", 401)].sum == 88
+    assert sink.sizes[("Exception", 500)].sum == len(b'"Error message"')
+    assert sink.sizes[("ValidationFailed", 400)].sum == len(
+        b'[{"item":1,"field_name":"","messages":["Error message"]}]'
+    )
+
+
+def test_flask_restx_handlers_are_measured(sink, client):
+    client.get("/forbidden")
+    client.get("/validation_failed")
+    assert sink.counts == {("Forbidden", 403): 1, ("ValidationFailed", 400): 1}
+    assert sink.durations[("ValidationFailed", 400)].count == 1
+    assert ("ValidationFailed", 400) not in sink.sizes
+
+
+def test_handlers_are_not_measured_without_sink(starlette_client):
+    sink = metrics.InMemorySink()
+    starlette_client.get("/unauthorized")
+    assert sink.counts == {}
+
+
+def test_prometheus_format():
+    sink = metrics.InMemorySink()
+    sink.duration_buckets = (0.1, 1.0)
+    sink.size_buckets = (10,)
+    sink.observe("Unauthorized", 401, 0.05, 5)
+    sink.observe("Unauthorized", 401, 0.5, 50)
+    sink.observe('Custom"Error', 500, 2.0, None)
+    assert sink.to_prometheus() == """# TYPE layaberr_errors_total counter
+layaberr_errors_total{exception="Unauthorized",status="401"} 2
+layaberr_errors_total{exception="Custom\\"Error",status="500"} 1
+# TYPE layaberr_error_duration_seconds histogram
+layaberr_error_duration_seconds_bucket{exception="Unauthorized",status="401",le="0.1"} 1
+layaberr_error_duration_seconds_bucket{exception="Unauthorized",status="401",le="1.0"} 2
+layaberr_error_duration_seconds_bucket{exception="Unauthorized",status="401",le="+Inf"} 2
+layaberr_error_duration_seconds_sum{exception="Unauthorized",status="401"} 0.55
+layaberr_error_duration_seconds_count{exception="Unauthorized",status="401"} 2
+layaberr_error_duration_seconds_bucket{exception="Custom\\"Error",status="500",le="0.1"} 0
+layaberr_error_duration_seconds_bucket{exception="Custom\\"Error",status="500",le="1.0"} 0
+layaberr_error_duration_seconds_bucket{exception="Custom\\"Error",status="500",le="+Inf"} 1
+layaberr_error_duration_seconds_sum{exception="Custom\\"Error",status="500"} 2.0
+layaberr_error_duration_seconds_count{exception="Custom\\"Error",status="500"} 1
+# TYPE layaberr_error_size_bytes histogram
+layaberr_error_size_bytes_bucket{exception="Unauthorized",status="401",le="10"} 1
+layaberr_error_size_bytes_bucket{exception="Unauthorized",status="401",le="+Inf"} 2
+layaberr_error_size_bytes_sum{exception="Unauthorized",status="401"} 55.0
+layaberr_error_size_bytes_count{exception="Unauthorized",status="401"} 2
+"""
+
+
+def test_callback_sink():
+    calls = []
+    sink = metrics.CallbackSink(lambda *args: calls.append(args))
+    sink.observe("Unauthorized", 401, 0.5, 10)
+    sink.observe("ValidationFailed", 400, 0.001, None)
+    assert calls == [
+        ("layaberr.errors", 1, "c", {"exception": "Unauthorized", "status": "401"}),
+        (
+            "layaberr.error_duration",
+            500.0,
+            "ms",
+            {"exception": "Unauthorized", "status": "401"},
+        ),
+        (
+            "layaberr.error_size",
+            10,
+            "h",
+            {"exception": "Unauthorized", "status": "401"},
+        ),
+        ("layaberr.errors", 1, "c", {"exception": "ValidationFailed", "status": "400"}),
+        (
+            "layaberr.error_duration",
+            1.0,
+            "ms",
+            {"exception": "ValidationFailed", "status": "400"},
+        ),
+    ]
+
+
+def test_sink_must_be_implemented():
+    class IncompleteSink(metrics.Sink):
+        def observe_exception(self, exception, status_code, duration, size):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink()
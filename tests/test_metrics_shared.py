@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr import metrics
+
+
+@pytest.fixture
+def sink(tmp_path):
+    sink = metrics.add_sink(metrics.SharedMemorySink(str(tmp_path)))
+    yield sink
+    metrics.remove_sink(sink)
+
+
+def _raise_errors(sink: metrics.SharedMemorySink, count: int) -> None:
+    for _ in range(count):
+        sink.observe("Forbidden", 403, 0.001, 10)
+    sink.observe("ValidationFailed", 400, 0.001, None)
+
+
+def test_counts_across_processes(sink):
+    sink.observe("Forbidden", 403, 0.001, 10)
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_raise_errors, args=(sink, 100)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert sink.counts() == {("Forbidden", 403): 401, ("ValidationFailed", 400): 4}
+
+
+def test_prometheus_export(sink):
+    app = Starlette(exception_handlers=layaberr.starlette.exception_handlers)
+
+    @app.route("/forbidden")
+    def forbidden(request):
+        raise layaberr.starlette.Forbidden()
+
+    client = TestClient(app, raise_server_exceptions=False)
+    client.get("/forbidden")
+    client.get("/forbidden")
+    assert sink.to_prometheus() == """# TYPE layaberr_errors_total counter
+layaberr_errors_total{exception="Forbidden",status="403"} 2
+"""
+
+
+def test_max_keys(tmp_path):
+    sink = metrics.SharedMemorySink(str(tmp_path), max_keys=1)
+    sink.observe("Forbidden", 403, 0.001, 10)
+    sink.observe("Unauthorized", 401, 0.001, 10)
+    sink.observe("Forbidden", 403, 0.001, 10)
+    assert sink.counts() == {("Forbidden", 403): 2}
+
+
+def test_other_files_are_ignored(tmp_path):
+    (tmp_path / "other.txt").write_text("content")
+    (tmp_path / "layaberr_1.db").write_bytes(b"")
+    sink = metrics.SharedMemorySink(str(tmp_path))
+    sink.observe("Forbidden", 403, 0.001, 10)
+    assert sink.counts() == {("Forbidden", 403): 1}
+
+
+def test_sinks_do_not_overwrite_counts(tmp_path):
+    first_sink = metrics.SharedMemorySink(str(tmp_path))
+    first_sink.observe("Forbidden", 403, 0.001, 10)
+    second_sink = metrics.SharedMemorySink(str(tmp_path))
+    second_sink.observe("Forbidden", 403, 0.001, 10)
+    first_sink.observe("Forbidden", 403, 0.001, 10)
+    assert second_sink.counts() == {("Forbidden", 403): 3}
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_files_of_exited_processes_are_not_overwritten(tmp_path):
+    context = multiprocessing.get_context("fork")
+    process = context.Process(
+        target=_raise_errors, args=(metrics.SharedMemorySink(str(tmp_path)), 2)
+    )
+    process.start()
+    process.join()
+    # Process identifier of the exited process is reused
+    (previous_file,) = tmp_path.iterdir()
+    previous_file.rename(tmp_path / f"layaberr_{os.getpid()}.db")
+
+    sink = metrics.SharedMemorySink(str(tmp_path))
+    sink.observe("Forbidden", 403, 0.001, 10)
+    assert sink.counts() == {("Forbidden", 403): 3, ("ValidationFailed", 400): 1}
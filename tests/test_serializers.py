@@ -0,0 +1,108 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr import serializers
+
+
+@pytest.fixture
+def serializer():
+    yield serializers.set_serializer
+    serializers.set_serializer("json")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(exception_handlers=layaberr.starlette.exception_handlers)
+
+    @app.route("/unauthorized")
+    def unauthorized(request):
+        raise layaberr.starlette.Unauthorized
+
+    @app.route("/default_error")
+    def default_error(request):
+        raise Exception("Error message")
+
+    @app.route("/validation_failed")
+    def validation_failed(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("name", list(serializers.available))
+def test_available_serializers(serializer, client, name):
+    serializer(name)
+    response = client.get("/validation_failed")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_optional_serializer_is_imported_once_set(serializer, name):
+    serializer(name)
+    assert serializers.current() is not serializers.available[name]
+    assert serializers.dumps({"a": ["é", 1]}) == '{"a":["é",1]}'.encode("utf-8")
+
+
+def test_optional_serializer_can_be_called():
+    assert serializers.available["orjson"]({"a": 1}) == b'{"a":1}'
+
+
+def test_optional_serializer_is_created_once():
+    msgspec_serializer = serializers.available["msgspec"]
+    assert msgspec_serializer.load() is msgspec_serializer.load()
+    assert msgspec_serializer({"a": 1}) == b'{"a":1}'
+
+
+def test_stdlib_dumps():
+    assert serializers.stdlib_dumps({"a": ["é", 1]}) == '{"a":["é",1]}'.encode("utf-8")
+
+
+def test_custom_serializer_used_by_all_handlers(serializer, client):
+    serializer(lambda content: b'"custom"')
+    for url in ("/unauthorized", "/default_error", "/validation_failed"):
+        response = client.get(url)
+        assert response.json() == "custom"
+        assert response.headers["content-type"] == "application/json"
+
+
+def test_unknown_serializer(serializer):
+    with pytest.raises(ValueError) as exception_info:
+        serializer("unknown")
+    assert str(exception_info.value).startswith(
+        "unknown serializer is not available. Available serializers are ['json'"
+    )
+
+
+def test_fastest(monkeypatch):
+    monkeypatch.setattr(serializers, "available", {"json": serializers.stdlib_dumps})
+    assert serializers.fastest() == "json"
+    monkeypatch.setitem(serializers.available, "msgspec", lambda content: b"")
+    assert serializers.fastest() == "msgspec"
+    monkeypatch.setitem(serializers.available, "orjson", lambda content: b"")
+    assert serializers.fastest() == "orjson"
+
+
+def test_dumps_cached(serializer):
+    serializers.cache_clear()
+    assert serializers.dumps_cached(Exception, "detail", 500) == b'"detail"'
+    assert serializers.dumps_cached(Exception, "detail", 500) == b'"detail"'
+    assert serializers.dumps_cached(ValueError, "detail", 500) == b'"detail"'
+    cache_info = serializers.cache_info()
+    assert (cache_info.hits, cache_info.misses, cache_info.currsize) == (1, 2, 2)
+
+
+def test_dumps_cached_unhashable_detail_is_not_cached(serializer):
+    serializers.cache_clear()
+    assert serializers.dumps_cached(Exception, {"a": 1}, 500) == b'{"a":1}'
+    assert serializers.cache_info().currsize == 0
+
+
+def test_dumps_cached_depends_on_serializer(serializer):
+    assert serializers.dumps_cached(Exception, "detail", 500) == b'"detail"'
+    serializer(lambda content: b'"custom"')
+    assert serializers.dumps_cached(Exception, "detail", 500) == b'"custom"'
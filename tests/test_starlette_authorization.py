@@ -25,6 +25,10 @@ def client():
     def unauthorized(request):
         raise layaberr.starlette.Forbidden(detail="Error message")
 
+    @app.route("/error/{index}")
+    def error(request):
+        raise Exception(f"Error {request.path_params['index']}")
+
     return TestClient(app, raise_server_exceptions=False)
 
 
@@ -50,3 +54,21 @@ def test_forbidden_detail(client):
     response = client.get("/forbidden_detail")
     assert response.status_code == 403
     assert response.json() == "Error message"
+
+
+def test_forbidden_body_is_cached(client):
+    client.get("/forbidden")
+    cache_info = layaberr.starlette.serializers.cache_info()
+    response = client.get("/forbidden")
+    assert response.json() == "Request forbidden -- authorization will not help"
+    assert layaberr.starlette.serializers.cache_info().hits == cache_info.hits + 1
+    assert layaberr.starlette.serializers.cache_info().misses == cache_info.misses
+
+
+def test_messages_are_not_cached(client):
+    client.get("/forbidden_detail")
+    cache_info = layaberr.starlette.serializers.cache_info()
+    for index in range(3):
+        assert client.get(f"/error/{index}").json() == f"Error {index}"
+        assert client.get("/forbidden_detail").json() == "Error message"
+    assert layaberr.starlette.serializers.cache_info() == cache_info
@@ -0,0 +1,85 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr.core import MessageCatalog, ValidationErrors
+
+catalog = MessageCatalog()
+REQUIRED = catalog.register("required", "Missing data for required field.")
+INVALID = catalog.register("invalid", "Not a valid integer.")
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=request.param, catalog=catalog, codes=True
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = ValidationErrors()
+        for index in range(2500):
+            errors.add("key 1", REQUIRED, item=index)
+            errors.add("key 2", INVALID, item=index)
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    content = response.json()
+    assert content["codes"] == {
+        "required": "Missing data for required field.",
+        "invalid": "Not a valid integer.",
+    }
+    assert len(content["errors"]) == 5000
+    assert content["errors"][:2] == [
+        {"item": 1, "field_name": "key 1", "messages": ["required"]},
+        {"item": 1, "field_name": "key 2", "messages": ["invalid"]},
+    ]
+
+
+def test_inlined_messages():
+    app = Starlette(
+        exception_handlers={
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                catalog=catalog
+            )
+        }
+    )
+
+    @app.route("/validation_failed")
+    def validation_failed(request):
+        raise layaberr.starlette.ValidationFailed({}, errors={"key 1": [REQUIRED]})
+
+    response = TestClient(app).get("/validation_failed")
+    assert response.json() == [
+        {
+            "item": 1,
+            "field_name": "key 1",
+            "messages": ["Missing data for required field."],
+        }
+    ]
+
+
+def test_codes_without_catalog():
+    with pytest.raises(ValueError) as exception_info:
+        layaberr.starlette.validation_failed_handler(codes=True)
+    assert str(exception_info.value) == "A message catalog is required to send codes."
+
+
+def test_documentation():
+    doc = layaberr.starlette.validation_failed_handler(
+        catalog=catalog, codes=True
+    ).__doc__
+    assert doc.startswith("\ntype: object\n")
+    assert "\n    codes:\n" in doc
+    assert "\n    summary:\n" not in doc
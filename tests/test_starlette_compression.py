@@ -0,0 +1,86 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=request.param, compression_threshold=1000
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = {index: {"key 1": ["an error"]} for index in range(2500)}
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("coding", ["gzip", "br"])
+def test_compressed(client, coding):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept-Encoding": coding}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Encoding"] == coding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    # Body is decompressed by the test client
+    content = response.json()
+    assert len(content) == 2500
+    assert content[0] == {"item": 1, "field_name": "key 1", "messages": ["an error"]}
+
+
+def test_not_accepted(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 400
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert len(response.json()) == 2500
+
+
+def test_offloaded_compression():
+    app = Starlette(
+        exception_handlers={
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                offload_threshold=1, compression_threshold=1000
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = {index: {"key 1": ["an error"]} for index in range(2500)}
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    response = TestClient(app).get(
+        "/validation_failed_list", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 2500
+
+
+def test_small_body_not_compressed():
+    handler = layaberr.starlette.validation_failed_handler(compression_threshold=1000)
+    app = Starlette(exception_handlers={layaberr.starlette.ValidationFailed: handler})
+
+    @app.route("/validation_failed_message")
+    def validation_failed_message(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    response = TestClient(app).get(
+        "/validation_failed_message", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
@@ -0,0 +1,107 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr.core import Retention
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=request.param, echo_length=10
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        raise layaberr.starlette.ValidationFailed(
+            [{"key 1": "valid"}, {"key 1": "a very long value", "key 2": [1, 2]}],
+            errors={1: {"key 1": ["Too long."], "key 3": ["Missing data."]}},
+        )
+
+    @app.route("/validation_failed_dict")
+    def validation_failed_dict(request):
+        raise layaberr.starlette.ValidationFailed(
+            {"key 1": {"nested": "value"}, "key 2": 3},
+            errors={"key 1": ["Not a valid integer."], "key 2": ["Too big."]},
+        )
+
+    @app.route("/validation_failed_dropped")
+    def validation_failed_dropped(request):
+        raise layaberr.starlette.ValidationFailed(
+            {"key 1": "value"},
+            errors={"key 1": ["Not a valid integer."]},
+            retention=Retention.drop,
+        )
+
+    @app.route("/validation_failed_offending_items")
+    def validation_failed_offending_items(request):
+        raise layaberr.starlette.ValidationFailed(
+            [{"key 1": "valid"}, {"key 1": "invalid"}],
+            errors={1: {"key 1": ["Not a valid integer."]}},
+            retention=Retention.offending_items,
+        )
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json() == [
+        {
+            "item": 2,
+            "field_name": "key 1",
+            "messages": ["Too long."],
+            "received": "a very ...",
+        },
+        {"item": 2, "field_name": "key 3", "messages": ["Missing data."]},
+    ]
+
+
+def test_validation_failed_dict(client):
+    response = client.get("/validation_failed_dict")
+    assert response.status_code == 400
+    assert response.json() == [
+        {
+            "item": 1,
+            "field_name": "key 1",
+            "messages": ["Not a valid integer."],
+            "received": '{"neste...',
+        },
+        {"item": 1, "field_name": "key 2", "messages": ["Too big."], "received": 3},
+    ]
+
+
+def test_dropped_received_data(client):
+    response = client.get("/validation_failed_dropped")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": 1, "field_name": "key 1", "messages": ["Not a valid integer."]}
+    ]
+
+
+def test_offending_items(client):
+    response = client.get("/validation_failed_offending_items")
+    assert response.status_code == 400
+    assert response.json() == [
+        {
+            "item": 2,
+            "field_name": "key 1",
+            "messages": ["Not a valid integer."],
+            "received": "invalid",
+        }
+    ]
+
+
+def test_received_values_are_documented():
+    assert (
+        "received:"
+        in layaberr.starlette.validation_failed_handler(echo_length=10).__doc__
+    )
+    assert "received:" not in layaberr.starlette.validation_failed_exception.__doc__
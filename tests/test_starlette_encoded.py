@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+from layaberr.core import EncodedErrors
+
+body = b'[{"item":1,"field_name":"key 1","messages":["an error"]}]'
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=request.param, compression_threshold=10
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_bytes")
+    def validation_failed_bytes(request):
+        raise layaberr.starlette.ValidationFailed([], errors=body)
+
+    @app.route("/validation_failed_memoryview")
+    def validation_failed_memoryview(request):
+        raise layaberr.starlette.ValidationFailed([], errors=memoryview(body))
+
+    @app.route("/validation_failed_ndjson")
+    def validation_failed_ndjson(request):
+        raise layaberr.starlette.ValidationFailed(
+            [],
+            errors=EncodedErrors(
+                b'{"item":1,"field_name":"key 1","messages":["an error"]}\n',
+                "application/x-ndjson",
+            ),
+        )
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize(
+    "path", ["/validation_failed_bytes", "/validation_failed_memoryview"]
+)
+def test_sent_as_is(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.headers["Content-Length"] == str(len(body))
+    assert response.content == body
+
+
+def test_sent_as_bytes_to_asgi_server():
+    app = Starlette(exception_handlers=layaberr.starlette.exception_handlers)
+
+    @app.route("/validation_failed_memoryview")
+    def validation_failed_memoryview(request):
+        raise layaberr.starlette.ValidationFailed([], errors=memoryview(body))
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/validation_failed_memoryview",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+    }
+    asyncio.run(app(scope, receive, send))
+    assert messages[0]["status"] == 400
+    assert [type(message["body"]) for message in messages[1:]] == [bytes]
+    assert messages[1]["body"] == body
+
+
+def test_compressed(client):
+    response = client.get(
+        "/validation_failed_memoryview", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == body
+
+
+def test_encoded_media_type(client):
+    response = client.get(
+        "/validation_failed_ndjson",
+        headers={"Accept": "application/x-ndjson, application/json"},
+    )
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.content == (
+        b'{"item":1,"field_name":"key 1","messages":["an error"]}\n'
+    )
+
+
+def test_decoded_if_not_accepted(client):
+    response = client.get(
+        "/validation_failed_ndjson", headers={"Accept": "application/json"}
+    )
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.json() == [
+        {"item": 1, "field_name": "key 1", "messages": ["an error"]}
+    ]
@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+class NotFound(Exception):
+    pass
+
+
+class ItemNotFound(NotFound):
+    pass
+
+
+class Conflict(HTTPException):
+    def __init__(self):
+        HTTPException.__init__(self, 409, "Item already exists.")
+
+
+class ClientClosedRequest(HTTPException):
+    def __init__(self):
+        HTTPException.__init__(self, 499, "Client closed request.")
+
+
+async def teapot(request, exc):
+    return layaberr.starlette.Response(b"teapot", status_code=418)
+
+
+@pytest.fixture
+def exception_handlers():
+    return (
+        layaberr.starlette.exception_handlers.copy()
+        .add(NotFound, HTTPStatus.NOT_FOUND)
+        .add(Conflict, HTTPStatus.CONFLICT)
+        .add(ClientClosedRequest, handler=layaberr.starlette.http_exception)
+        .add(ZeroDivisionError, handler=teapot)
+    )
+
+
+@pytest.fixture
+def client(exception_handlers):
+    app = Starlette(exception_handlers=exception_handlers)
+
+    @app.route("/not_found")
+    def not_found(request):
+        raise ItemNotFound("Item 1 cannot be found.")
+
+    @app.route("/conflict")
+    def conflict(request):
+        raise Conflict()
+
+    @app.route("/forbidden")
+    def forbidden(request):
+        raise layaberr.starlette.Forbidden()
+
+    @app.route("/teapot")
+    def zero_division(request):
+        1 / 0
+
+    @app.route("/unknown_status")
+    def unknown_status(request):
+        raise ClientClosedRequest()
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_status_handler(client):
+    response = client.get("/not_found")
+    assert response.status_code == 404
+    assert response.json() == "Item 1 cannot be found."
+
+
+def test_http_exception_detail(client):
+    response = client.get("/conflict")
+    assert response.status_code == 409
+    assert response.json() == "Item already exists."
+
+
+def test_default_handlers_are_kept(client):
+    response = client.get("/forbidden")
+    assert response.status_code == 403
+
+
+def test_custom_handler(client):
+    response = client.get("/teapot")
+    assert response.status_code == 418
+    assert response.content == b"teapot"
+
+
+def test_default_handlers_are_not_modified(exception_handlers):
+    assert NotFound not in layaberr.starlette.exception_handlers
+    assert len(layaberr.starlette.exception_handlers) == 4
+
+
+def test_resolve(exception_handlers):
+    handler = exception_handlers.resolve(ItemNotFound)
+    assert handler is exception_handlers[NotFound]
+    assert exception_handlers.resolve(ItemNotFound) is handler
+    assert (
+        exception_handlers.resolve(layaberr.starlette.ValidationFailed)
+        is layaberr.starlette.validation_failed_exception
+    )
+    assert exception_handlers.resolve(KeyError) is layaberr.starlette.exception
+
+
+def test_resolve_without_handler():
+    exception_handlers = layaberr.starlette.ExceptionHandlers()
+    assert exception_handlers.resolve(KeyError) is None
+
+
+def test_resolved_handlers_are_updated(exception_handlers):
+    assert exception_handlers.resolve(ItemNotFound) is exception_handlers[NotFound]
+    exception_handlers[ItemNotFound] = teapot
+    assert exception_handlers.resolve(ItemNotFound) is teapot
+    del exception_handlers[ItemNotFound]
+    assert exception_handlers.resolve(ItemNotFound) is exception_handlers[NotFound]
+
+
+def test_add_without_handler():
+    with pytest.raises(ValueError) as exception_info:
+        layaberr.starlette.ExceptionHandlers().add(NotFound)
+    assert (
+        str(exception_info.value) == "Either http_status or handler must be provided."
+    )
+
+
+def test_messages_are_not_cached(client):
+    cache_info = layaberr.starlette.serializers.cache_info()
+    assert client.get("/not_found").json() == "Item 1 cannot be found."
+    assert client.get("/conflict").json() == "Item already exists."
+    response = client.get("/unknown_status")
+    assert response.status_code == 499
+    assert response.json() == "Client closed request."
+    assert layaberr.starlette.serializers.cache_info() == cache_info
+
+
+def test_merge_as_dict():
+    exception_handlers = {**layaberr.starlette.exception_handlers, NotFound: teapot}
+    assert exception_handlers[Exception] is layaberr.starlette.exception
+
+
+def test_repr():
+    assert (
+        repr(layaberr.starlette.ExceptionHandlers({NotFound: teapot}))
+        == f"ExceptionHandlers({{{NotFound!r}: {teapot!r}}})"
+    )
+
+
+def test_documentation():
+    assert (
+        layaberr.starlette.error_handler(HTTPStatus.NOT_FOUND).__doc__
+        == layaberr.starlette.http_exception.__doc__
+    )
@@ -0,0 +1,83 @@
+import msgpack
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                streaming=request.param
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = {index: {"key 1": ["an error"]} for index in range(2500)}
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_ndjson(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = response.content.splitlines()
+    assert len(lines) == 2500
+    assert lines[0] == b'{"item":1,"field_name":"key 1","messages":["an error"]}'
+
+
+def test_msgpack(client):
+    response = client.get(
+        "/validation_failed_list", headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 400
+    assert response.headers["Content-Type"] == "application/msgpack"
+    content = msgpack.unpackb(response.content)
+    assert len(content) == 2500
+    assert content[0] == {"item": 1, "field_name": "key 1", "messages": ["an error"]}
+
+
+def test_json_by_default(client):
+    response = client.get("/validation_failed_list", headers={"Accept": "*/*"})
+    assert response.headers["Content-Type"] == "application/json"
+    assert len(response.json()) == 2500
+
+
+def test_summarized_ndjson():
+    app = Starlette(
+        exception_handlers={
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                max_items=1, streaming=True
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = {index: {"key 1": ["an error"]} for index in range(2500)}
+        raise layaberr.starlette.ValidationFailed([], errors=errors)
+
+    response = TestClient(app).get(
+        "/validation_failed_list", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.content == (
+        b'{"item":1,"field_name":"key 1","messages":["an error"]}\n'
+        b'{"summary":{"total":2500,"fields":{"key 1":2500}}}\n'
+    )
+
+
+def test_documentation():
+    assert (
+        "description: Sent as application/json, application/x-ndjson, application/msgpack"
+        in layaberr.starlette.validation_failed_exception.__doc__
+    )
@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        ThreadPoolExecutor.__init__(self, max_workers=1)
+        self.submitted = 0
+        self.arguments = None
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        self.arguments = args
+        return ThreadPoolExecutor.submit(self, *args, **kwargs)
+
+
+def client(**handler_options):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                **handler_options
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        errors = {index: {"key 1": ["an error"]} for index in range(3)}
+        raise layaberr.starlette.ValidationFailed(
+            [{"key 1": index} for index in range(3)], errors=errors
+        )
+
+    @app.route("/validation_failed_message")
+    def validation_failed_message(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def executor():
+    executor = RecordingExecutor()
+    yield executor
+    executor.shutdown()
+
+
+def test_large_number_of_errors_is_offloaded(executor):
+    response = client(offload_threshold=2, executor=executor).get(
+        "/validation_failed_list"
+    )
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": index + 1, "field_name": "key 1", "messages": ["an error"]}
+        for index in range(3)
+    ]
+    assert executor.submitted == 1
+
+
+def test_received_data_is_not_sent_to_executor(executor):
+    client(offload_threshold=2, executor=executor).get("/validation_failed_list")
+    assert [{"key 1": index} for index in range(3)] not in executor.arguments
+
+
+def test_received_data_is_sent_to_executor_when_echoed(executor):
+    response = client(offload_threshold=2, executor=executor, echo_length=10).get(
+        "/validation_failed_list"
+    )
+    assert response.json()[2] == {
+        "item": 3,
+        "field_name": "key 1",
+        "messages": ["an error"],
+        "received": 2,
+    }
+    assert [{"key 1": index} for index in range(3)] in executor.arguments
+
+
+def test_small_number_of_errors_is_not_offloaded(executor):
+    response = client(offload_threshold=2, executor=executor).get(
+        "/validation_failed_message"
+    )
+    assert response.json() == [
+        {"item": 1, "field_name": "", "messages": ["Error message"]}
+    ]
+    assert executor.submitted == 0
+
+
+def test_summarized_errors_are_offloaded(executor):
+    response = client(offload_threshold=1, max_items=1, executor=executor).get(
+        "/validation_failed_list"
+    )
+    assert response.json() == {
+        "errors": [{"item": 1, "field_name": "key 1", "messages": ["an error"]}],
+        "summary": {"total": 3, "fields": {"key 1": 3}},
+    }
+    assert executor.submitted == 1
+
+
+def test_default_executor():
+    response = client(offload_threshold=1).get("/validation_failed_list")
+    assert len(response.json()) == 3
+
+
+def test_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        response = client(offload_threshold=1, executor=executor).get(
+            "/validation_failed_list"
+        )
+    assert len(response.json()) == 3
@@ -0,0 +1,80 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+@pytest.fixture
+def client():
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.streaming_validation_failed_exception,
+        }
+    )
+
+    @app.route("/validation_failed_item")
+    def validation_failed_item(request):
+        received_data = {"key 1": "value 1", "key 2": 1}
+        errors = {
+            "a field": ["an error"],
+            "another_field": ["first error", "second error"],
+        }
+        raise layaberr.starlette.ValidationFailed(received_data, errors=errors)
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        received_data = [{"key 1": f"value {index}"} for index in range(2500)]
+        errors = {index: {"key 1": ["an error é."]} for index in range(2500)}
+        raise layaberr.starlette.ValidationFailed(received_data, errors=errors)
+
+    @app.route("/validation_failed_message")
+    def validation_failed_message(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_validation_failed_item(client):
+    response = client.get("/validation_failed_item")
+    assert response.status_code == 400
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [
+        {"item": 1, "field_name": "a field", "messages": ["an error"]},
+        {
+            "item": 1,
+            "field_name": "another_field",
+            "messages": ["first error", "second error"],
+        },
+    ]
+
+
+def test_validation_failed_list_spanning_multiple_chunks(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": index + 1, "field_name": "key 1", "messages": ["an error é."]}
+        for index in range(2500)
+    ]
+
+
+def test_validation_failed_message(client):
+    response = client.get("/validation_failed_message")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"field_name": "", "item": 1, "messages": ["Error message"]}
+    ]
+
+
+def test_json_array_chunks():
+    assert list(layaberr.starlette._iter_json_array(iter([1, 2, 3]), 2)) == [
+        b"[",
+        b"1,2",
+        b",3",
+        b"]",
+    ]
+
+
+def test_empty_json_array():
+    assert b"".join(layaberr.starlette._iter_json_array(iter([]), 2)) == b"[]"
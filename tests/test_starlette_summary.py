@@ -0,0 +1,62 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import layaberr.starlette
+
+
+@pytest.fixture(params=[False, True], ids=["default", "streaming"])
+def client(request):
+    app = Starlette(
+        exception_handlers={
+            **layaberr.starlette.exception_handlers,
+            layaberr.starlette.ValidationFailed: layaberr.starlette.validation_failed_handler(
+                max_items=2, max_messages=1, streaming=request.param
+            ),
+        }
+    )
+
+    @app.route("/validation_failed_list")
+    def validation_failed_list(request):
+        received_data = [{"key 1": f"value {index}"} for index in range(2500)]
+        errors = {
+            index: {"key 1": ["first error", "second error"], "key 2": ["an error"]}
+            for index in range(2500)
+        }
+        raise layaberr.starlette.ValidationFailed(received_data, errors=errors)
+
+    @app.route("/validation_failed_message")
+    def validation_failed_message(request):
+        raise layaberr.starlette.ValidationFailed({}, message="Error message")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_validation_failed_list(client):
+    response = client.get("/validation_failed_list")
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": [
+            {"item": 1, "field_name": "key 1", "messages": ["first error"]},
+            {"item": 1, "field_name": "key 2", "messages": ["an error"]},
+        ],
+        "summary": {"total": 5000, "fields": {"key 1": 2500, "key 2": 2500}},
+    }
+
+
+def test_validation_failed_message(client):
+    response = client.get("/validation_failed_message")
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": [{"field_name": "", "item": 1, "messages": ["Error message"]}],
+        "summary": {"total": 1, "fields": {"": 1}},
+    }
+
+
+def test_documentation():
+    assert layaberr.starlette.validation_failed_handler().__doc__.startswith(
+        "\ntype: array\n"
+    )
+    assert layaberr.starlette.validation_failed_handler(max_items=1).__doc__.startswith(
+        "\ntype: object\n"
+    )
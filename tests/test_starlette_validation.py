@@ -33,6 +33,15 @@ def client():
         }
         raise layaberr.starlette.ValidationFailed(received_data, errors=errors)
 
+    @app.route("/validation_failed_validation_errors")
+    def validation_failed_validation_errors(request):
+        errors = layaberr.starlette.ValidationErrors()
+        errors.add("a field", "an error 1.")
+        errors.add("a field", "an error 2.", item=1)
+        errors.add("another_field", "first error 2", item=1)
+        errors.add("another_field", "second error 2", item=1)
+        raise layaberr.starlette.ValidationFailed([{}, {}], errors=errors)
+
     @app.route("/validation_failed_message")
     def validation_failed_list(request):
         raise layaberr.starlette.ValidationFailed({}, message="Error message")
@@ -73,3 +82,38 @@ def test_validation_failed_message(client):
     assert response.json() == [
         {"field_name": "", "item": 1, "messages": ["Error message"]}
     ]
+
+
+def test_validation_failed_validation_errors(client):
+    response = client.get("/validation_failed_validation_errors")
+    assert response.status_code == 400
+    assert response.json() == [
+        {"item": 1, "field_name": "a field", "messages": ["an error 1."]},
+        {"item": 2, "field_name": "a field", "messages": ["an error 2."]},
+        {
+            "item": 2,
+            "field_name": "another_field",
+            "messages": ["first error 2", "second error 2"],
+        },
+    ]
+
+
+def test_collect_validation_errors():
+    with pytest.raises(layaberr.starlette.ValidationFailed) as exception_info:
+        with layaberr.starlette.ValidationFailed.collect(
+            [{}, {}], fail_fast=True
+        ) as errors:
+            for index in range(2):
+                errors.add("key", "Missing data for required field.", item=index)
+    assert exception_info.value.received_data == [{}, {}]
+    assert exception_info.value.status_code == 400
+    assert len(exception_info.value.errors) == 1
+
+
+def test_offending_items_retention():
+    exception = layaberr.starlette.ValidationFailed(
+        [{"key": 1}, {"key": 2}],
+        errors={1: {"key": ["an error"]}},
+        retention="offending_items",
+    )
+    assert exception.received_data == {1: {"key": 2}}